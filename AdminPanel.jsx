@@ -1,26 +1,83 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
-import { ArrowLeft, Users, Activity, TrendingUp, Eye } from 'lucide-react';
+import { ArrowLeft, Users, Activity, TrendingUp, Eye, Download } from 'lucide-react';
 import { toast } from 'sonner';
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from './ui/dialog';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+const applyStatsDelta = (current, delta) => {
+  const next = { ...current };
+  Object.entries(delta).forEach(([key, value]) => {
+    next[key] = typeof value === 'object'
+      ? applyStatsDelta(current[key] || {}, value)
+      : (current[key] || 0) + value;
+  });
+  return next;
+};
+
 export default function AdminPanel() {
   const navigate = useNavigate();
   const [stats, setStats] = useState(null);
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [search, setSearch] = useState('');
+  const [prakritiFilter, setPrakritiFilter] = useState('');
   const [selectedUser, setSelectedUser] = useState(null);
   const [userDetails, setUserDetails] = useState(null);
   const [showDialog, setShowDialog] = useState(false);
+  const appendNewUsers = useRef(false);
 
   useEffect(() => {
-    fetchStats();
-    fetchUsers();
+    if (typeof EventSource === 'undefined') {
+      fetchStats();
+      return undefined;
+    }
+    // Snapshot first, then coalesced deltas; reconnects receive a fresh snapshot
+    const source = new EventSource(`${API}/admin/stats/stream`, { withCredentials: true });
+    source.addEventListener('snapshot', (event) => setStats(JSON.parse(event.data)));
+    source.addEventListener('stats', (event) => {
+      const delta = JSON.parse(event.data);
+      setStats(prev => (prev ? applyStatsDelta(prev, delta) : prev));
+    });
+    source.addEventListener('new_users', (event) => {
+      if (!appendNewUsers.current) return;
+      const newUsers = JSON.parse(event.data);
+      setUsers(prev => [...prev, ...newUsers.filter(newUser => !prev.some(existing => existing.id === newUser.id))]);
+    });
+    source.addEventListener('prakriti_changes', (event) => {
+      const changes = JSON.parse(event.data);
+      setUsers(prev => prev.map(existing => (
+        changes[existing.id] !== undefined ? { ...existing, prakriti_type: changes[existing.id] } : existing
+      )));
+    });
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        fetchStats();
+      }
+    };
+    return () => source.close();
   }, []);
 
+  useEffect(() => {
+    // New users sort last, so they only belong in a fully loaded, unfiltered list
+    appendNewUsers.current = !nextCursor && !search.trim() && !prakritiFilter;
+  }, [nextCursor, search, prakritiFilter]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => fetchUsers(), 300);
+    return () => clearTimeout(timer);
+  }, [search, prakritiFilter]);
+
+  const userFilters = () => {
+    const params = {};
+    if (search.trim()) params.q = search.trim();
+    if (prakritiFilter) params.prakriti_type = prakritiFilter;
+    return params;
+  };
+
   const fetchStats = async () => {
     try {
       const response = await axios.get(`${API}/admin/stats`, { withCredentials: true });
@@ -30,18 +87,29 @@ export default function AdminPanel() {
     }
   };
 
-  const fetchUsers = async () => {
+  const fetchUsers = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/admin/users`, { withCredentials: true });
-      setUsers(response.data);
+      const params = { ...userFilters() };
+      if (cursor) params.cursor = cursor;
+      const response = await axios.get(`${API}/admin/users`, { params, withCredentials: true });
+      setUsers(prev => (cursor ? [...prev, ...response.data.users] : response.data.users));
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       toast.error('Failed to load users');
     }
   };
 
+  const exportUrl = (format) => {
+    const params = new URLSearchParams({ ...userFilters(), format });
+    return `${API}/admin/users/export?${params.toString()}`;
+  };
+
   const viewUserDetails = async (userId) => {
     try {
-      const response = await axios.get(`${API}/admin/user/${userId}/details`, { withCredentials: true });
+      const response = await axios.get(`${API}/admin/user/${userId}/details`, {
+        params: { follow_ups_limit: 3 },
+        withCredentials: true
+      });
       setUserDetails(response.data);
       setSelectedUser(userId);
       setShowDialog(true);
@@ -133,6 +201,35 @@ export default function AdminPanel() {
 
         <div className="users-section card" data-testid="users-section">
           <h2>All Users</h2>
+          <div className="users-toolbar">
+            <input
+              type="search"
+              className="users-search"
+              placeholder="Search by name or email prefix"
+              value={search}
+              onChange={(e) => setSearch(e.target.value)}
+              data-testid="users-search"
+            />
+            <select
+              className="users-filter"
+              value={prakritiFilter}
+              onChange={(e) => setPrakritiFilter(e.target.value)}
+              data-testid="users-prakriti-filter"
+            >
+              <option value="">All Prakriti types</option>
+              <option value="Vata">Vata</option>
+              <option value="Pitta">Pitta</option>
+              <option value="Kapha">Kapha</option>
+            </select>
+            <a className="export-btn" href={exportUrl('csv')} data-testid="export-csv">
+              <Download size={16} />
+              CSV
+            </a>
+            <a className="export-btn" href={exportUrl('ndjson')} data-testid="export-ndjson">
+              <Download size={16} />
+              NDJSON
+            </a>
+          </div>
           <div className="users-table">
             <div className="table-header">
               <span>Name</span>
@@ -157,6 +254,11 @@ export default function AdminPanel() {
               </div>
             ))}
           </div>
+          {nextCursor && (
+            <button className="btn-secondary load-more-btn" onClick={() => fetchUsers(nextCursor)} data-testid="load-more-users">
+              Load more
+            </button>
+          )}
         </div>
       </div>
 
@@ -201,9 +303,29 @@ export default function AdminPanel() {
                 </div>
               </div>
 
+              {userDetails.progress && userDetails.progress.count > 0 && (
+                <div className="detail-section">
+                  <h3>Progress</h3>
+                  <div className="detail-grid">
+                    <div className="detail-item">
+                      <span className="detail-label">Follow-ups:</span>
+                      <span data-testid="detail-progress-count">{userDetails.progress.count}</span>
+                    </div>
+                    <div className="detail-item">
+                      <span className="detail-label">Average Rating:</span>
+                      <span data-testid="detail-progress-average">{userDetails.progress.average_rating ?? 'N/A'}</span>
+                    </div>
+                    <div className="detail-item">
+                      <span className="detail-label">Recent Average:</span>
+                      <span data-testid="detail-progress-rolling">{userDetails.progress.rolling_average_rating ?? 'N/A'}</span>
+                    </div>
+                  </div>
+                </div>
+              )}
+
               {userDetails.follow_ups && userDetails.follow_ups.length > 0 && (
                 <div className="detail-section">
-                  <h3>Recent Follow-ups ({userDetails.follow_ups.length})</h3>
+                  <h3>Recent Follow-ups ({userDetails.progress ? userDetails.progress.count : userDetails.follow_ups.length})</h3>
                   <div className="follow-ups-summary">
                     {userDetails.follow_ups.slice(0, 3).map((followUp, index) => (
                       <div key={followUp.id} className="follow-up-item" data-testid={`detail-followup-${index}`}>
@@ -361,11 +483,55 @@ export default function AdminPanel() {
           margin-bottom: 24px;
         }
 
+        .users-toolbar {
+          display: flex;
+          flex-wrap: wrap;
+          gap: 12px;
+          margin-bottom: 20px;
+        }
+
+        .users-search,
+        .users-filter {
+          padding: 10px 14px;
+          border: 1px solid #e5e1d8;
+          border-radius: 8px;
+          font-size: 14px;
+          color: #2c3e3a;
+          background: white;
+        }
+
+        .users-search {
+          flex: 1;
+          min-width: 200px;
+        }
+
+        .export-btn {
+          display: flex;
+          align-items: center;
+          gap: 6px;
+          padding: 10px 14px;
+          background: #e8f4e8;
+          border-radius: 8px;
+          color: #6b8e6f;
+          font-size: 14px;
+          font-weight: 500;
+          text-decoration: none;
+        }
+
+        .export-btn:hover {
+          background: #d4e9d4;
+        }
+
         .users-table {
           display: flex;
           flex-direction: column;
         }
 
+        .load-more-btn {
+          margin: 20px auto 0;
+          display: block;
+        }
+
         .table-header,
         .table-row {
           display: grid;
@@ -27,20 +27,22 @@ export default function Dashboard() {
 
   const fetchUserData = async () => {
     try {
-      const userRes = await axios.get(`${API}/auth/me`, { withCredentials: true });
-      setUser(userRes.data);
-
-      const profileRes = await axios.get(`${API}/profile`, { withCredentials: true });
-      setProfile(profileRes.data);
+      const response = await axios.get(`${API}/bootstrap`, {
+        params: { sections: 'user,profile' },
+        withCredentials: true
+      });
+      const { user: userData, profile: profileData } = response.data;
+      setUser(userData);
+      setProfile(profileData);
       
-      if (profileRes.data.age) {
+      if (profileData.age) {
         setFormData({
-          age: profileRes.data.age || '',
-          gender: profileRes.data.gender || '',
-          contact: profileRes.data.contact || '',
-          body_type: profileRes.data.body_type || '',
-          lifestyle: profileRes.data.lifestyle || '',
-          health_concerns: profileRes.data.health_concerns || []
+          age: profileData.age || '',
+          gender: profileData.gender || '',
+          contact: profileData.contact || '',
+          body_type: profileData.body_type || '',
+          lifestyle: profileData.lifestyle || '',
+          health_concerns: profileData.health_concerns || []
         });
       }
     } catch (error) {
@@ -10,6 +10,8 @@ const API = `${BACKEND_URL}/api`;
 export default function FollowUps() {
   const navigate = useNavigate();
   const [followUps, setFollowUps] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [progress, setProgress] = useState(null);
   const [showForm, setShowForm] = useState(false);
   const [formData, setFormData] = useState({
     date: new Date().toISOString().split('T')[0],
@@ -20,17 +22,31 @@ export default function FollowUps() {
 
   useEffect(() => {
     fetchFollowUps();
+    fetchProgress();
   }, []);
 
-  const fetchFollowUps = async () => {
+  const fetchFollowUps = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API}/follow-ups`, { withCredentials: true });
-      setFollowUps(response.data);
+      const response = await axios.get(`${API}/follow-ups`, {
+        params: cursor ? { cursor } : {},
+        withCredentials: true
+      });
+      setFollowUps(prev => (cursor ? [...prev, ...response.data.follow_ups] : response.data.follow_ups));
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       toast.error('Failed to load follow-ups');
     }
   };
 
+  const fetchProgress = async () => {
+    try {
+      const response = await axios.get(`${API}/follow-ups/progress`, { withCredentials: true });
+      setProgress(response.data);
+    } catch (error) {
+      console.error('Error fetching progress:', error);
+    }
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     try {
@@ -44,6 +60,7 @@ export default function FollowUps() {
         feedback: ''
       });
       fetchFollowUps();
+      fetchProgress();
     } catch (error) {
       toast.error('Failed to add follow-up');
     }
@@ -79,6 +96,27 @@ export default function FollowUps() {
           </button>
         </div>
 
+        {progress && progress.count > 0 && (
+          <div className="progress-summary card" data-testid="progress-summary">
+            <div className="progress-stat">
+              <span className="progress-label">Entries</span>
+              <span className="progress-value" data-testid="progress-count">{progress.count}</span>
+            </div>
+            <div className="progress-stat">
+              <span className="progress-label">Average Rating</span>
+              <span className="progress-value" data-testid="progress-average">{progress.average_rating ?? '-'}</span>
+            </div>
+            <div className="progress-stat">
+              <span className="progress-label">Last {progress.rolling_window} Entries</span>
+              <span className="progress-value" data-testid="progress-rolling">{progress.rolling_average_rating ?? '-'}</span>
+            </div>
+            <div className="progress-stat">
+              <span className="progress-label">Last Entry</span>
+              <span className="progress-value small" data-testid="progress-last-date">{formatDate(progress.last_date)}</span>
+            </div>
+          </div>
+        )}
+
         {showForm && (
           <div className="follow-up-form card" data-testid="followup-form">
             <h2>New Follow-up Entry</h2>
@@ -187,6 +225,11 @@ export default function FollowUps() {
                 )}
               </div>
             ))}
+            {nextCursor && (
+              <button className="btn-secondary load-more-btn" onClick={() => fetchFollowUps(nextCursor)} data-testid="load-more-followups">
+                Load more
+              </button>
+            )}
           </div>
         )}
       </div>
@@ -331,6 +374,39 @@ export default function FollowUps() {
           gap: 20px;
         }
 
+        .load-more-btn {
+          align-self: center;
+        }
+
+        .progress-summary {
+          display: grid;
+          grid-template-columns: repeat(auto-fit, minmax(160px, 1fr));
+          gap: 20px;
+          margin-bottom: 32px;
+        }
+
+        .progress-stat {
+          display: flex;
+          flex-direction: column;
+          gap: 4px;
+        }
+
+        .progress-label {
+          font-size: 14px;
+          color: #5a6b66;
+          font-weight: 500;
+        }
+
+        .progress-value {
+          font-size: 28px;
+          font-weight: 700;
+          color: #2c3e3a;
+        }
+
+        .progress-value.small {
+          font-size: 18px;
+        }
+
         .follow-up-card .card-header {
           display: flex;
           justify-content: space-between;
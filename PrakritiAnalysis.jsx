@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { ArrowLeft, Loader2, Sparkles } from 'lucide-react';
@@ -15,10 +15,13 @@ export default function PrakritiAnalysis() {
   const [result, setResult] = useState(null);
   const [loading, setLoading] = useState(false);
   const [profile, setProfile] = useState(null);
+  const jobSource = useRef(null);
+  const jobPoll = useRef(null);
 
   useEffect(() => {
     fetchQuestions();
     fetchProfile();
+    return () => stopFollowingJob();
   }, []);
 
   const fetchQuestions = async () => {
@@ -34,14 +37,69 @@ export default function PrakritiAnalysis() {
     try {
       const response = await axios.get(`${API}/profile`, { withCredentials: true });
       setProfile(response.data);
-      if (response.data.prakriti_analysis) {
-        setResult(response.data.prakriti_analysis);
+      const analysis = response.data.prakriti_analysis;
+      if (analysis) {
+        setResult(analysis);
+        if (analysis.insights_status === 'pending' && analysis.job_id) {
+          followJob(analysis.job_id);
+        }
       }
     } catch (error) {
       console.error('Error fetching profile:', error);
     }
   };
 
+  const stopFollowingJob = () => {
+    if (jobSource.current) {
+      jobSource.current.close();
+      jobSource.current = null;
+    }
+    clearTimeout(jobPoll.current);
+  };
+
+  const applyJob = (job) => {
+    if (job.status === 'done') {
+      setResult(prev => ({ ...prev, ai_insights: job.ai_insights, insights_status: 'done' }));
+      return true;
+    }
+    if (job.status === 'failed') {
+      setResult(prev => ({ ...prev, insights_status: 'failed' }));
+      return true;
+    }
+    return false;
+  };
+
+  const pollJob = async (jobId) => {
+    try {
+      const response = await axios.get(`${API}/prakriti/jobs/${jobId}`, { withCredentials: true });
+      if (applyJob(response.data)) {
+        return;
+      }
+    } catch (error) {
+      console.error('Error polling analysis job:', error);
+    }
+    jobPoll.current = setTimeout(() => pollJob(jobId), 2000);
+  };
+
+  const followJob = (jobId) => {
+    stopFollowingJob();
+    if (typeof EventSource === 'undefined') {
+      pollJob(jobId);
+      return;
+    }
+    const source = new EventSource(`${API}/prakriti/jobs/${jobId}/events`, { withCredentials: true });
+    source.onmessage = (event) => {
+      if (applyJob(JSON.parse(event.data))) {
+        stopFollowingJob();
+      }
+    };
+    source.onerror = () => {
+      stopFollowingJob();
+      pollJob(jobId);
+    };
+    jobSource.current = source;
+  };
+
   const handleAnswer = (questionIndex, answer) => {
     setAnswers({ ...answers, [questionIndex]: answer });
     if (currentQuestion < questions.length - 1) {
@@ -58,11 +116,14 @@ export default function PrakritiAnalysis() {
     setLoading(true);
     try {
       const response = await axios.post(
-        `${API}/prakriti/analyze`,
+        `${API}/prakriti/analyze?mode=async`,
         { answers },
         { withCredentials: true }
       );
       setResult(response.data);
+      if (response.data.job_id) {
+        followJob(response.data.job_id);
+      }
       toast.success('Analysis complete!');
     } catch (error) {
       toast.error('Failed to analyze results');
@@ -114,7 +175,16 @@ export default function PrakritiAnalysis() {
 
           <div className="ai-insights card" data-testid="ai-insights">
             <h2>Personalized Insights</h2>
-            <p>{result.ai_insights}</p>
+            {result.ai_insights ? (
+              <p>{result.ai_insights}</p>
+            ) : result.insights_status === 'failed' ? (
+              <p data-testid="ai-insights-failed">We couldn't generate your insights right now. Please try the analysis again later.</p>
+            ) : (
+              <p className="insights-pending" data-testid="ai-insights-pending">
+                <Loader2 size={18} className="spinner" color="#6b8e6f" />
+                Preparing your personalized insights...
+              </p>
+            )}
           </div>
 
           <div className="next-steps">
@@ -225,6 +295,12 @@ export default function PrakritiAnalysis() {
             color: #2c3e3a;
           }
 
+          .insights-pending {
+            display: flex;
+            align-items: center;
+            gap: 10px;
+          }
+
           .next-steps {
             display: flex;
             gap: 16px;
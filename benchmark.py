@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Load benchmark for the /api routes. Boots server.app in-process against a local
+# mongod (or mongomock-motor with --mongo mock) and replaces LlmChat and the
+# OAuth backend with deterministic fakes of configurable latency.
+#
+#   python benchmark.py --users 500 --requests 2000 --concurrency 32
+#   python benchmark.py --compare bench_results_before.json
+#   FAST_JSON=1 python benchmark.py --accept-encoding gzip --compare bench_results.json
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "ihwp_benchmark")
+os.environ.setdefault("EMERGENT_LLM_KEY", "benchmark")
+# The benchmark drives many analyses per user; keep the per-user bucket out of the way
+os.environ.setdefault("LLM_USER_BURST", "1000000")
+
+import httpx
+
+import server
+
+DOSHAS = ("Vata", "Pitta", "Kapha")
+
+class FakeLlmChat:
+    latency = 0.0
+    calls = 0
+
+    def __init__(self, api_key=None, session_id=None, system_message=None):
+        self.session_id = session_id
+
+    def with_model(self, provider, model):
+        return self
+
+    async def send_message(self, message):
+        FakeLlmChat.calls += 1
+        await asyncio.sleep(self.latency)
+        return f"Deterministic benchmark insight for {self.session_id}."
+
+def fake_auth_transport(latency):
+    async def handler(request):
+        await asyncio.sleep(latency)
+        session_id = request.headers["X-Session-ID"]
+        return httpx.Response(200, json={
+            "id": f"login-{session_id}",
+            "email": f"{session_id}@bench.example.com",
+            "name": f"Login {session_id}",
+            "session_token": f"login-token-{session_id}",
+        })
+    return httpx.MockTransport(handler)
+
+def random_answers(rng):
+    return {
+        str(index): rng.choice(question["options"])
+        for index, question in enumerate(server.PRAKRITI_QUESTIONS)
+    }
+
+async def use_mock_mongo():
+    from mongomock_motor import AsyncMongoMockClient
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[os.environ["DB_NAME"]]
+
+async def seed(users, follow_ups_per_user):
+    await server.client.drop_database(os.environ["DB_NAME"])
+    await server.ensure_indexes()
+    now = datetime.now(timezone.utc)
+    user_docs, session_docs, profile_docs, follow_up_docs = [], [], [], []
+    for i in range(users):
+        user_id = f"bench-user-{i}"
+        dosha = DOSHAS[i % len(DOSHAS)]
+        user = server.User(
+            id=user_id,
+            email=f"user{i}@bench.example.com",
+            name=f"Bench User {i}",
+            prakriti_type=dosha,
+            created_at=now - timedelta(minutes=users - i),
+        )
+        user_docs.append({**user.model_dump(), **server.user_search_fields(user.name, user.email)})
+        session_docs.append(server.UserSession(
+            user_id=user_id,
+            session_token=f"bench-token-{i}",
+            expires_at=now + timedelta(days=7),
+        ).model_dump())
+        profile_docs.append(server.UserProfile(
+            user_id=user_id,
+            age=20 + i % 50,
+            prakriti_type=dosha,
+            prakriti_analysis={"prakriti_type": dosha, "scores": {d: 4 if d == dosha else 3 for d in DOSHAS}},
+        ).model_dump())
+        for j in range(follow_ups_per_user):
+            follow_up_docs.append(server.FollowUp(
+                user_id=user_id,
+                date=now - timedelta(days=j),
+                notes="Feeling better",
+                progress_rating=1 + (i + j) % 5,
+            ).model_dump())
+    for collection, docs in (
+        ("users", user_docs),
+        ("user_sessions", session_docs),
+        ("user_profiles", profile_docs),
+        ("follow_ups", follow_up_docs),
+    ):
+        if docs:
+            await server.db[collection].insert_many(docs)
+    await server.reconcile_admin_stats()
+
+def build_scenarios(users):
+    def auth(i):
+        return {"Authorization": f"Bearer bench-token-{i % users}"}
+
+    def user_id(i):
+        return f"bench-user-{(i * 7) % users}"
+
+    return {
+        "auth_me": lambda i, rng: ("GET", "/api/auth/me", auth(i), None),
+        "profile": lambda i, rng: ("GET", "/api/profile", auth(i), None),
+        "prakriti_questions": lambda i, rng: ("GET", "/api/prakriti/questions", {}, None),
+        "prakriti_analyze": lambda i, rng: ("POST", "/api/prakriti/analyze", auth(i), {"answers": random_answers(rng)}),
+        "prakriti_analyze_async": lambda i, rng: ("POST", "/api/prakriti/analyze?mode=async", auth(i), {"answers": random_answers(rng)}),
+        "diet_plan": lambda i, rng: ("GET", "/api/diet-plan", auth(i), None),
+        "daily_schedule": lambda i, rng: ("GET", "/api/daily-schedule", auth(i), None),
+        "follow_ups": lambda i, rng: ("GET", "/api/follow-ups", auth(i), None),
+        "create_follow_up": lambda i, rng: ("POST", "/api/follow-ups", auth(i), {"notes": "bench", "progress_rating": rng.randint(1, 5)}),
+        "bootstrap": lambda i, rng: ("GET", "/api/bootstrap", auth(i), None),
+        "login": lambda i, rng: ("GET", f"/api/auth/session?session_id=s{i}-{rng.getrandbits(32)}", {}, None),
+        "admin_stats": lambda i, rng: ("GET", "/api/admin/stats", auth(i), None),
+        "admin_users": lambda i, rng: ("GET", "/api/admin/users", auth(i), None),
+        "admin_user_details": lambda i, rng: ("GET", f"/api/admin/user/{user_id(i)}/details", auth(i), None),
+        "admin_users_details": lambda i, rng: ("POST", "/api/admin/users/details", auth(i), {"user_ids": [user_id(i + k) for k in range(20)]}),
+    }
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def run_scenario(http, build, requests, concurrency, warmup, seed_value):
+    rng = random.Random(seed_value)
+    latencies, statuses, sizes = [], {}, []
+    counter = iter(range(warmup + requests))
+
+    async def worker():
+        for i in counter:
+            method, url, headers, body = build(i, rng)
+            started = time.perf_counter()
+            response = await http.request(method, url, headers=headers, json=body)
+            elapsed = time.perf_counter() - started
+            if i >= warmup:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                sizes.append(response.num_bytes_downloaded)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    # Warm-up requests are included in wall time; scale throughput to measured requests
+    measured_wall = wall * requests / (warmup + requests)
+    return {
+        "requests": requests,
+        "throughput_rps": round(requests / measured_wall, 1) if measured_wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+        "avg_bytes": round(sum(sizes) / len(sizes)),
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, previous=None):
+    print(f"{'route':24} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'bytes':>8}  status")
+    for name, stats in results["routes"].items():
+        line = f"{name:24} {stats['throughput_rps']:>9} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['avg_bytes']:>8}  {stats['status_codes']}"
+        before = (previous or {}).get("routes", {}).get(name)
+        if before:
+            line += f"  (p99 {before['p99_ms']} -> {stats['p99_ms']}, rps {before['throughput_rps']} -> {stats['throughput_rps']}"
+            if "avg_bytes" in before:
+                line += f", bytes {before['avg_bytes']} -> {stats['avg_bytes']}"
+            line += ")"
+        print(line)
+
+async def main(args):
+    if "bench" not in os.environ["DB_NAME"]:
+        sys.exit(f"Refusing to reset database {os.environ['DB_NAME']!r}: DB_NAME must contain 'bench'")
+    if args.mongo == "mock":
+        await use_mock_mongo()
+
+    server.LlmChat = FakeLlmChat
+    FakeLlmChat.latency = args.llm_latency
+    await server.app.router.startup()
+    await server.auth_client.aclose()
+    server.auth_client = server.create_auth_client(transport=fake_auth_transport(args.auth_latency))
+
+    await seed(args.users, args.follow_ups)
+    scenarios = build_scenarios(args.users)
+    selected = args.routes.split(",") if args.routes else list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        sys.exit(f"Unknown routes: {', '.join(unknown)}; choose from {', '.join(scenarios)}")
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "mongo": args.mongo,
+            "users": args.users,
+            "follow_ups_per_user": args.follow_ups,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+            "auth_latency": args.auth_latency,
+            "fast_json": server.FAST_JSON,
+            "accept_encoding": args.accept_encoding,
+        },
+        "routes": {},
+    }
+    transport = httpx.ASGITransport(app=server.app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", headers={"Accept-Encoding": args.accept_encoding}
+        ) as http:
+            for name in selected:
+                results["routes"][name] = await run_scenario(
+                    http, scenarios[name], args.requests, args.concurrency, args.warmup, args.seed
+                )
+    finally:
+        await server.app.router.shutdown()
+    results["meta"]["llm_calls"] = FakeLlmChat.calls
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_results(results, previous)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.output}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load benchmark for the Ayurveda API")
+    parser.add_argument("--mongo", choices=["local", "mock"], default="local",
+                        help="local uses MONGO_URL; mock uses mongomock-motor in-process")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--follow-ups", type=int, default=10, help="follow-ups seeded per user")
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--auth-latency", type=float, default=0.05, help="seconds per fake OAuth exchange")
+    parser.add_argument("--accept-encoding", default="identity",
+                        help="Accept-Encoding sent with every request, e.g. gzip or br")
+    parser.add_argument("--routes", help="comma-separated subset of routes to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
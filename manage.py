@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from server import (
+    ADMIN_DETAIL_LOOKUPS,
+    ADMIN_DETAIL_SECTIONS,
+    ADMIN_USERS_SORT,
+    DAILY_SCHEDULE_TEMPLATES,
+    DIET_PLAN_TEMPLATES,
+    DOSHAS,
+    FOLLOW_UPS_SORT,
+    INSIGHT_PROMPT_VERSION,
+    PLAN_TEMPLATE_VERSION,
+    PRAKRITI_JOB_SWEEP_SORT,
+    PRAKRITI_QUESTIONS,
+    _admin_users_page_query,
+    _exhausted_jobs_query,
+    _follow_ups_query,
+    _runnable_jobs_query,
+    _user_details_pipeline,
+    build_follow_up_rollup,
+    db,
+    dosha_scorer,
+    encode_page_cursor,
+    ensure_indexes,
+    fallback_insights,
+    get_insights,
+    insight_key,
+    plan_overrides,
+    primary_dosha_for,
+    reconcile_admin_stats,
+    user_search_fields,
+)
+
+def route_queries():
+    # (name, collection, filter, sort) for each query issued by the API routes,
+    # built with the server's own query builders so the probes cannot drift
+    now = datetime.now(timezone.utc)
+    cursor = encode_page_cursor(now, "x")
+    return [
+        ("auth session lookup", "user_sessions", {"session_token": "x"}, None),
+        ("auth user lookup", "users", {"id": "x"}, None),
+        ("login user lookup", "users", {"email": "x@example.com"}, None),
+        ("profile", "user_profiles", {"user_id": "x"}, None),
+        ("admin stats distribution", "user_profiles", {"prakriti_type": "Vata"}, None),
+        ("diet plan", "diet_plans", {"user_id": "x"}, None),
+        ("daily schedule", "daily_schedules", {"user_id": "x"}, None),
+        ("follow-ups", "follow_ups", _follow_ups_query("x"), FOLLOW_UPS_SORT),
+        ("follow-ups next page", "follow_ups", _follow_ups_query("x", cursor), FOLLOW_UPS_SORT),
+        ("admin users page", "users", _admin_users_page_query(None, None, None), ADMIN_USERS_SORT),
+        ("admin users next page", "users", _admin_users_page_query(None, None, cursor), ADMIN_USERS_SORT),
+        ("admin users by prakriti", "users", _admin_users_page_query(None, "Vata", cursor), ADMIN_USERS_SORT),
+        ("admin users search", "users", _admin_users_page_query("x", None, cursor), ADMIN_USERS_SORT),
+        ("prakriti job", "prakriti_jobs", {"id": "x", "user_id": "x"}, None),
+        ("prakriti job claim", "prakriti_jobs", {"id": "x", **_runnable_jobs_query(now)}, None),
+        ("prakriti job sweep", "prakriti_jobs", _runnable_jobs_query(now), PRAKRITI_JOB_SWEEP_SORT),
+        ("prakriti job exhausted", "prakriti_jobs", _exhausted_jobs_query(now), PRAKRITI_JOB_SWEEP_SORT),
+        *(
+            (f"user details {section}", collection, {foreign_field: "x"}, None)
+            for section, (collection, foreign_field) in ADMIN_DETAIL_LOOKUPS.items()
+        ),
+    ]
+
+def route_pipelines():
+    # (name, collection, pipeline) for each aggregation issued by the API routes
+    return [
+        ("user details", "users", _user_details_pipeline(["x"], list(ADMIN_DETAIL_SECTIONS))),
+    ]
+
+def _plan_stages(plan):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+def _report_plan(name, collection, winning_plan):
+    stages = [stage for stage in _plan_stages(winning_plan) if stage]
+    status = "COLLSCAN" if "COLLSCAN" in stages else "ok"
+    print(f"{status:8} {name:28} {collection}: {' <- '.join(stages)}")
+    return status != "ok"
+
+async def check_indexes():
+    await ensure_indexes()
+    failures = 0
+    for name, collection, query, sort in route_queries():
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        failures += _report_plan(name, collection, explain["queryPlanner"]["winningPlan"])
+    for name, collection, pipeline in route_pipelines():
+        explain = await db.command("aggregate", collection, pipeline=pipeline, explain=True)
+        # Older servers nest the plan of the initial $match under a $cursor stage
+        planner = explain.get("queryPlanner") or explain["stages"][0]["$cursor"]["queryPlanner"]
+        failures += _report_plan(name, collection, planner["winningPlan"])
+    return failures
+
+async def warm_insights(concurrency=4):
+    total = len(PRAKRITI_QUESTIONS)
+    vectors = [
+        {"Vata": vata, "Pitta": pitta, "Kapha": total - vata - pitta}
+        for vata in range(total + 1)
+        for pitta in range(total + 1 - vata)
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def warm(counts):
+        nonlocal failures
+        async with semaphore:
+            try:
+                await get_insights(counts, primary_dosha_for(counts))
+            except Exception as e:
+                failures += 1
+                print(f"failed   {counts}: {e}")
+
+    await asyncio.gather(*(warm(counts) for counts in vectors))
+    print(f"warmed {len(vectors) - failures}/{len(vectors)} score vectors")
+    return failures
+
+async def reconcile_stats():
+    stats = await reconcile_admin_stats()
+    print(f"reconciled stats counters: {stats}")
+    return 0
+
+async def backfill_user_prakriti(chunk_size=1000):
+    # Copies user_profiles.prakriti_type onto users for the admin listing filter
+    updated = 0
+    batch = []
+    cursor = db.user_profiles.find({}, {"_id": 0, "user_id": 1, "prakriti_type": 1}).batch_size(chunk_size)
+    async for profile in cursor:
+        batch.append(UpdateOne({"id": profile["user_id"]}, {"$set": {"prakriti_type": profile.get("prakriti_type")}}))
+        if len(batch) >= chunk_size:
+            result = await db.users.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    if batch:
+        result = await db.users.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    print(f"updated prakriti_type on {updated} users")
+    return 0
+
+async def backfill_user_search(chunk_size=1000):
+    # Fills the lower-cased name/email copies the admin search matches on
+    updated = 0
+    batch = []
+    cursor = db.users.find({}, {"_id": 1, "name": 1, "email": 1}).batch_size(chunk_size)
+    async for user in cursor:
+        batch.append(UpdateOne({"_id": user["_id"]}, {"$set": user_search_fields(user.get("name"), user.get("email"))}))
+        if len(batch) >= chunk_size:
+            result = await db.users.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    if batch:
+        result = await db.users.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    print(f"updated search fields on {updated} users")
+    return 0
+
+async def compact_plans(chunk_size=1000):
+    # Replaces legacy per-user plan copies with template references
+    for collection, templates in (("diet_plans", DIET_PLAN_TEMPLATES), ("daily_schedules", DAILY_SCHEDULE_TEMPLATES)):
+        removed = rewritten = 0
+        batch = []
+        cursor = db[collection].find({"overrides": {"$exists": False}}).batch_size(chunk_size)
+        async for doc in cursor:
+            template = templates.get(doc.get("prakriti_type"))
+            overrides = plan_overrides(template, doc) if template else {}
+            if overrides:
+                batch.append(ReplaceOne({"_id": doc["_id"]}, {
+                    "user_id": doc["user_id"],
+                    "prakriti_type": doc["prakriti_type"],
+                    "template_version": PLAN_TEMPLATE_VERSION,
+                    "overrides": overrides,
+                }))
+                rewritten += 1
+            else:
+                batch.append(DeleteOne({"_id": doc["_id"]}))
+                removed += 1
+            if len(batch) >= chunk_size:
+                await db[collection].bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await db[collection].bulk_write(batch, ordered=False)
+        print(f"{collection}: removed {removed} template copies, kept overrides for {rewritten}")
+    return 0
+
+async def rescore_profiles(chunk_size=5000):
+    # Re-scores every stored analysis with the current questionnaire weights
+    cached_insights = {
+        doc["_id"]: doc["insights"]
+        async for doc in db.prakriti_insights.find({"_id": {"$regex": f"^{INSIGHT_PROMPT_VERSION}:"}})
+    }
+    scanned = changed = skipped = 0
+
+    async def flush(profiles):
+        nonlocal changed
+        options = np.array([
+            (profile["prakriti_analysis"]["answer_options"] + [-1] * dosha_scorer.question_count)[:dosha_scorer.question_count]
+            for profile in profiles
+        ])
+        totals = dosha_scorer.score_batch(options) + np.array([
+            dosha_scorer.unmatched_weights(profile["prakriti_analysis"].get("unmatched_answers", {}))
+            for profile in profiles
+        ])
+        primaries = totals.argmax(axis=1)
+        profile_writes, user_writes = [], []
+        for profile, row, primary in zip(profiles, totals.tolist(), primaries.tolist()):
+            counts = dict(zip(DOSHAS, row))
+            prakriti_type = DOSHAS[primary]
+            analysis = profile["prakriti_analysis"]
+            if analysis.get("scores") == counts and profile.get("prakriti_type") == prakriti_type:
+                continue
+            update = {
+                "prakriti_type": prakriti_type,
+                "prakriti_analysis.prakriti_type": prakriti_type,
+                "prakriti_analysis.scores": counts,
+            }
+            # The stored insight described the old scores: reuse a cached one for
+            # the new vector or write the deterministic summary. Dropping job_id
+            # detaches any in-flight job, which would otherwise overwrite this
+            # with insights for the old scores.
+            insights = cached_insights.get(insight_key(counts))
+            update["prakriti_analysis.ai_insights"] = insights or fallback_insights(counts, prakriti_type)
+            update["prakriti_analysis.insights_source"] = "ai" if insights else "fallback"
+            update["prakriti_analysis.insights_status"] = "done"
+            profile_writes.append(UpdateOne(
+                {"_id": profile["_id"]},
+                {"$set": update, "$unset": {"prakriti_analysis.job_id": ""}}
+            ))
+            if profile.get("prakriti_type") != prakriti_type:
+                user_writes.append(UpdateOne({"id": profile["user_id"]}, {"$set": {"prakriti_type": prakriti_type}}))
+        if profile_writes:
+            await db.user_profiles.bulk_write(profile_writes, ordered=False)
+        if user_writes:
+            await db.users.bulk_write(user_writes, ordered=False)
+        changed += len(profile_writes)
+
+    batch = []
+    cursor = db.user_profiles.find(
+        {"prakriti_analysis.answer_options": {"$exists": True}},
+        {
+            "user_id": 1,
+            "prakriti_type": 1,
+            "prakriti_analysis.answer_options": 1,
+            "prakriti_analysis.unmatched_answers": 1,
+            "prakriti_analysis.scores": 1,
+        },
+    ).batch_size(chunk_size)
+    async for profile in cursor:
+        analysis = profile["prakriti_analysis"]
+        if "unmatched_answers" not in analysis and -1 in analysis["answer_options"]:
+            # Stored before unmatched answers were kept: a -1 may hide tag-matched
+            # points that can no longer be replayed, so leave the scores alone
+            skipped += 1
+            continue
+        batch.append(profile)
+        scanned += 1
+        if len(batch) >= chunk_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    print(f"re-scored {scanned} profiles, {changed} changed, {skipped} skipped (unreplayable answers)")
+    # Bucket moves bypassed the $inc counters
+    await reconcile_admin_stats()
+    return 0
+
+async def _rebuild_user_rollup(user_id, attempts=5):
+    # Compare-and-swap on the rollup's count, which every $inc from the API
+    # bumps: the count is read before the follow-ups, so a follow-up that lands
+    # in between makes the replace miss and the user is rebuilt again. The one
+    # remaining gap is a follow-up inserted but not yet $inc-ed when the
+    # replace lands; its $inc then counts it a second time.
+    projection = {"_id": 0, "date": 1, "progress_rating": 1}
+    for _ in range(attempts):
+        current = await db.follow_up_rollups.find_one({"_id": user_id}, {"count": 1})
+        follow_ups = await db.follow_ups.find({"user_id": user_id}, projection).to_list(None)
+        rollup = build_follow_up_rollup(follow_ups)
+        if current is None:
+            if not follow_ups:
+                return True
+            try:
+                await db.follow_up_rollups.insert_one({"_id": user_id, **rollup})
+                return True
+            except DuplicateKeyError:
+                continue
+        expected = {"_id": user_id, "count": current.get("count")}
+        if not follow_ups:
+            if (await db.follow_up_rollups.delete_one(expected)).deleted_count:
+                return True
+        elif (await db.follow_up_rollups.replace_one(expected, rollup)).matched_count:
+            return True
+    return False
+
+async def rebuild_follow_up_rollups(concurrency=16):
+    # Rebuilds rollups one user at a time while the API keeps writing; there is
+    # no window where a user's rollup is missing or partially replayed
+    user_ids = {doc["_id"] async for doc in db.follow_ups.aggregate([{"$group": {"_id": "$user_id"}}], allowDiskUse=True)}
+    # Rollups whose user no longer has any follow-ups
+    user_ids.update([doc["_id"] async for doc in db.follow_up_rollups.find({}, {"_id": 1})])
+    user_ids = sorted(user_ids)
+    failed = []
+    for start in range(0, len(user_ids), concurrency):
+        chunk = user_ids[start:start + concurrency]
+        results = await asyncio.gather(*(_rebuild_user_rollup(user_id) for user_id in chunk))
+        failed.extend(user_id for user_id, ok in zip(chunk, results) if not ok)
+    print(f"rebuilt rollups for {len(user_ids) - len(failed)} users")
+    for user_id in failed:
+        print(f"  gave up on {user_id}: follow-ups kept arriving, run again")
+    return len(failed)
+
+COMMANDS = {
+    "check-indexes": check_indexes,
+    "warm-insights": warm_insights,
+    "reconcile-stats": reconcile_stats,
+    "backfill-user-prakriti": backfill_user_prakriti,
+    "backfill-user-search": backfill_user_search,
+    "compact-plans": compact_plans,
+    "rescore-profiles": rescore_profiles,
+    "rebuild-follow-up-rollups": rebuild_follow_up_rollups,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance commands for the Ayurveda API")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    failures = asyncio.run(COMMANDS[args.command]())
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,172 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, OperationFailure
 import os
+import asyncio
+import base64
+import codecs
+import csv
+import hashlib
+import io
+import json
 import logging
+import random
+import re
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from contextvars import ContextVar
+import threading
+import time
 import uuid
+import zlib
 from datetime import datetime, timezone, timedelta
 import httpx
+import numpy as np
+try:
+    import brotli
+except ImportError:
+    brotli = None
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Metrics
+# Minimal Prometheus-format metrics served on /metrics. Mongo commands are timed
+# by a pymongo command listener, which runs on Motor's executor threads, hence
+# the locks.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '0'))
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            # [per-bucket counts..., +Inf count, sum]
+            series = self._values.setdefault(labels, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = _format_labels(self.labelnames + ("le",), labels + (repr(bound),))
+                    lines.append(f"{self.name}_bucket{le} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames + ('le',), labels + ('+Inf',))} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-2]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+def render_sample(name: str, help_text: str, value: float, metric_type: str = "gauge") -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}", f"{name} {value}"]
+
+http_request_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+http_requests_total = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+mongo_command_duration = Histogram("mongo_command_duration_seconds", "MongoDB command latency", ("collection", "command"))
+mongo_command_failures = Counter("mongo_command_failures_total", "Failed MongoDB commands", ("collection", "command"))
+llm_call_duration = Histogram("llm_call_duration_seconds", "LLM call latency by outcome", ("outcome",))
+llm_tokens_estimated = Counter("llm_tokens_estimated_total", "Approximate LLM tokens (characters / 4); the provider SDK does not report usage", ("kind",))
+
+# Per-request list of (collection, command, ms) for the slow request log
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        target = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+        self._collections[event.request_id] = target if isinstance(target, str) else ""
+
+    def _finish(self, event, failed: bool):
+        collection = self._collections.pop(event.request_id, "")
+        labels = (collection, event.command_name)
+        mongo_command_duration.observe(labels, event.duration_micros / 1e6)
+        if failed:
+            mongo_command_failures.inc(labels)
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.append((collection, event.command_name, round(event.duration_micros / 1000, 2)))
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
 db = client[os.environ['DB_NAME']]
 
+# Response serialization
+# FAST_JSON=1 switches the default response class to orjson (an optional
+# dependency). Hot routes return json_response, which serializes straight to
+# bytes and skips FastAPI's jsonable_encoder pass over the payload.
+FAST_JSON = os.environ.get('FAST_JSON', '').lower() in ('1', 'true', 'yes')
+if FAST_JSON:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+
+def dump_json(content: Any) -> bytes:
+    if FAST_JSON:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=dump_json(content), status_code=status_code, media_type="application/json", headers=headers)
+
 # Create the main app
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse if FAST_JSON else JSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # Emergent LLM Key
@@ -35,6 +179,7 @@ class User(BaseModel):
     email: EmailStr
     name: str
     picture: Optional[str] = None
+    prakriti_type: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class UserSession(BaseModel):
@@ -65,26 +210,19 @@ class PrakritiQuestion(BaseModel):
 class PrakritiResponse(BaseModel):
     answers: Dict[str, str]
 
-class DietPlan(BaseModel):
+class PrakritiJob(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     prakriti_type: str
-    recommended_foods: List[str]
-    avoid_foods: List[str]
-    meal_timings: Dict[str, str]
-    seasonal_tips: List[str]
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class DailySchedule(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    user_id: str
-    prakriti_type: str
-    wake_time: str
-    sleep_time: str
-    activities: List[Dict[str, str]]
+    scores: Dict[str, int]
+    status: str = "pending"
+    attempts: int = 0
+    ai_insights: Optional[str] = None
+    error: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class FollowUp(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -96,110 +234,364 @@ class FollowUp(BaseModel):
     feedback: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class UserDetailsRequest(BaseModel):
+    user_ids: List[str]
+
+# Session cache
+# Maps a session token to its resolved User so authenticated routes skip the
+# user_sessions + users round trips. Entries never outlive the session's
+# expires_at and are dropped on logout.
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', '10000'))
+SESSION_CACHE_TTL = float(os.environ.get('SESSION_CACHE_TTL', '300'))
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class SessionCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, session_token: str) -> Optional[User]:
+        entry = self._entries.get(session_token)
+        if entry is None:
+            self.misses += 1
+            return None
+        user, deadline = entry
+        if deadline <= time.monotonic():
+            del self._entries[session_token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(session_token)
+        self.hits += 1
+        return user
+
+    def set(self, session_token: str, user: User, expires_at: datetime):
+        remaining = (_as_utc(expires_at) - datetime.now(timezone.utc)).total_seconds()
+        ttl = min(self.ttl, remaining)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._entries[session_token] = (user, time.monotonic() + ttl)
+        self._entries.move_to_end(session_token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def evict(self, session_token: str):
+        self._entries.pop(session_token, None)
+
+    def evict_user(self, user_id: str):
+        stale = [token for token, (user, _) in self._entries.items() if user.id == user_id]
+        for token in stale:
+            del self._entries[token]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+session_cache = SessionCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
+
 # Auth Helper
-async def get_current_user(request: Request) -> User:
+def get_session_token(request: Request) -> Optional[str]:
     session_token = request.cookies.get('session_token')
     if not session_token:
         auth_header = request.headers.get('Authorization')
         if auth_header and auth_header.startswith('Bearer '):
             session_token = auth_header.replace('Bearer ', '')
+    return session_token
+
+async def get_current_user(request: Request) -> User:
+    session_token = get_session_token(request)
     
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
+    cached_user = session_cache.get(session_token)
+    if cached_user is not None:
+        return cached_user
+    
     session = await db.user_sessions.find_one({"session_token": session_token})
-    if not session or session['expires_at'] < datetime.now(timezone.utc):
+    if not session or _as_utc(session['expires_at']) < datetime.now(timezone.utc):
         raise HTTPException(status_code=401, detail="Session expired")
     
     user = await db.users.find_one({"id": session['user_id']}, {"_id": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return User(**user)
+    # Stored documents were validated on write; skip re-validating on every miss
+    user = User.model_construct(**user)
+    session_cache.set(session_token, user, session['expires_at'])
+    return user
 
-# Auth Routes
-@api_router.get("/auth/session")
-async def create_session(session_id: str, response: Response):
-    async with httpx.AsyncClient() as client:
+# Event bus
+# In-process pub/sub for lightweight write-path notifications. Every subscriber
+# owns a bounded queue; when a slow consumer falls behind, its oldest event is
+# dropped and counted instead of blocking the publisher. Subscribers only see
+# events published by the same worker process.
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', '256'))
+
+class Subscription:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+class EventBus:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, set] = {}
+        self.published = 0
+        self.dropped = 0
+    
+    def publish(self, topic: str, event: Dict[str, Any]):
+        self.published += 1
+        for subscription in self._subscriptions.get(topic, ()):
+            if subscription.queue.full():
+                subscription.queue.get_nowait()
+                subscription.dropped += 1
+                self.dropped += 1
+            subscription.queue.put_nowait(event)
+    
+    @asynccontextmanager
+    async def subscribe(self, topic: str):
+        subscription = Subscription(self.queue_size)
+        subscriptions = self._subscriptions.setdefault(topic, set())
+        subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscriptions.discard(subscription)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+            "published": self.published,
+            "dropped": self.dropped
+        }
+
+event_bus = EventBus(EVENT_QUEUE_SIZE)
+
+# Admin stats counters
+# /api/admin/stats reads a single materialized counters document that the write
+# paths keep current with $inc. The $inc never upserts: if the document is
+# missing, stats fall back to compute_admin_stats until reconcile_admin_stats
+# (run at startup and by `python manage.py reconcile-stats`) rebuilds it.
+STATS_COUNTERS_ID = "global"
+DOSHAS = ("Vata", "Pitta", "Kapha")
+
+async def bump_stats(increments: Dict[str, int]):
+    increments = {key: value for key, value in increments.items() if value}
+    if increments:
+        await db.stats_counters.update_one({"_id": STATS_COUNTERS_ID}, {"$inc": increments})
+        event_bus.publish("admin", {"type": "stats", "increments": increments})
+
+def prakriti_transition(old_type: Optional[str], new_type: Optional[str]) -> Dict[str, int]:
+    increments = {}
+    if old_type == new_type:
+        return increments
+    if old_type in DOSHAS:
+        increments[f"prakriti_distribution.{old_type}"] = -1
+    if new_type in DOSHAS:
+        increments[f"prakriti_distribution.{new_type}"] = 1
+    if not old_type and new_type:
+        increments["profiles_completed"] = 1
+    elif old_type and not new_type:
+        increments["profiles_completed"] = -1
+    return increments
+
+async def compute_admin_stats() -> Dict[str, Any]:
+    profile_facets = db.user_profiles.aggregate([{"$facet": {
+        "completed": [
+            {"$match": {"prakriti_type": {"$ne": None}}},
+            {"$count": "count"}
+        ],
+        "distribution": [
+            {"$match": {"prakriti_type": {"$in": list(DOSHAS)}}},
+            {"$group": {"_id": "$prakriti_type", "count": {"$sum": 1}}}
+        ]
+    }}]).to_list(1)
+    total_users, total_follow_ups, facets = await asyncio.gather(
+        db.users.count_documents({}),
+        db.follow_ups.count_documents({}),
+        profile_facets
+    )
+    facets = facets[0]
+    distribution = {dosha: 0 for dosha in DOSHAS}
+    for bucket in facets['distribution']:
+        distribution[bucket['_id']] = bucket['count']
+    
+    return {
+        "total_users": total_users,
+        "profiles_completed": facets['completed'][0]['count'] if facets['completed'] else 0,
+        "total_follow_ups": total_follow_ups,
+        "prakriti_distribution": distribution
+    }
+
+async def reconcile_admin_stats() -> Dict[str, Any]:
+    stats = await compute_admin_stats()
+    await db.stats_counters.replace_one(
+        {"_id": STATS_COUNTERS_ID},
+        {**stats, "reconciled_at": datetime.now(timezone.utc)},
+        upsert=True
+    )
+    return stats
+
+# OAuth backend client
+# One pooled keep-alive client for the session exchange, created on startup and
+# closed on shutdown. AUTH_BASE_URL can point at a local stub server.
+AUTH_BASE_URL = os.environ.get('AUTH_BASE_URL', 'https://demobackend.emergentagent.com')
+AUTH_CONNECT_TIMEOUT = float(os.environ.get('AUTH_CONNECT_TIMEOUT', '3'))
+AUTH_READ_TIMEOUT = float(os.environ.get('AUTH_READ_TIMEOUT', '10'))
+AUTH_MAX_CONNECTIONS = int(os.environ.get('AUTH_MAX_CONNECTIONS', '50'))
+AUTH_MAX_KEEPALIVE = int(os.environ.get('AUTH_MAX_KEEPALIVE', '20'))
+AUTH_MAX_RETRIES = int(os.environ.get('AUTH_MAX_RETRIES', '2'))
+AUTH_RETRY_BACKOFF = float(os.environ.get('AUTH_RETRY_BACKOFF', '0.2'))
+# Failures where the session-data request cannot have reached the backend, or
+# the backend explicitly asked us to come back later
+AUTH_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+AUTH_RETRYABLE_STATUS = {502, 503, 504}
+
+auth_client: Optional[httpx.AsyncClient] = None
+
+def create_auth_client(**kwargs) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=AUTH_BASE_URL,
+        timeout=httpx.Timeout(AUTH_READ_TIMEOUT, connect=AUTH_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=AUTH_MAX_CONNECTIONS,
+            max_keepalive_connections=AUTH_MAX_KEEPALIVE,
+            keepalive_expiry=30
+        ),
+        **kwargs
+    )
+
+async def fetch_oauth_session(session_id: str) -> Dict[str, Any]:
+    for attempt in range(AUTH_MAX_RETRIES + 1):
+        last_attempt = attempt == AUTH_MAX_RETRIES
         try:
-            resp = await client.get(
-                "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
+            resp = await auth_client.get(
+                "/auth/v1/env/oauth/session-data",
                 headers={"X-Session-ID": session_id}
             )
-            resp.raise_for_status()
-            data = resp.json()
-            
-            # Check if user exists
-            existing_user = await db.users.find_one({"email": data['email']}, {"_id": 0})
-            
-            if not existing_user:
-                user = User(
-                    id=data['id'],
-                    email=data['email'],
-                    name=data['name'],
-                    picture=data.get('picture')
-                )
-                await db.users.insert_one(user.model_dump())
-            else:
-                user = User(**existing_user)
-            
-            # Create session
-            session_token = data['session_token']
-            expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-            
-            session = UserSession(
-                user_id=user.id,
-                session_token=session_token,
-                expires_at=expires_at
-            )
-            await db.user_sessions.insert_one(session.model_dump())
-            
-            # Set cookie
-            response.set_cookie(
-                key="session_token",
-                value=session_token,
-                httponly=True,
-                secure=True,
-                samesite="none",
-                max_age=7*24*60*60,
-                path="/"
+            if resp.status_code not in AUTH_RETRYABLE_STATUS or last_attempt:
+                resp.raise_for_status()
+                return resp.json()
+        except AUTH_RETRYABLE_ERRORS:
+            if last_attempt:
+                raise
+        # Full jitter so a login storm does not retry in lockstep
+        await asyncio.sleep(random.uniform(0, AUTH_RETRY_BACKOFF * 2 ** attempt))
+
+# Auth Routes
+@api_router.get("/auth/session")
+async def create_session(session_id: str, response: Response):
+    try:
+        data = await fetch_oauth_session(session_id)
+        
+        # Check if user exists
+        existing_user = await db.users.find_one({"email": data['email']}, {"_id": 0})
+        
+        if not existing_user:
+            user = User(
+                id=data['id'],
+                email=data['email'],
+                name=data['name'],
+                picture=data.get('picture')
             )
-            
-            return {"user": user.model_dump(), "success": True}
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=str(e))
+            await db.users.insert_one({**user.model_dump(), **user_search_fields(user.name, user.email)})
+            await bump_stats({"total_users": 1})
+            event_bus.publish("admin", {"type": "new_user", "user": user.model_dump(include=set(ADMIN_USER_FIELDS))})
+        else:
+            user = User.model_construct(**existing_user)
+        
+        # Create session
+        session_token = data['session_token']
+        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+        
+        session = UserSession(
+            user_id=user.id,
+            session_token=session_token,
+            expires_at=expires_at
+        )
+        await db.user_sessions.insert_one(session.model_dump())
+        
+        # Set cookie
+        response.set_cookie(
+            key="session_token",
+            value=session_token,
+            httponly=True,
+            secure=True,
+            samesite="none",
+            max_age=7*24*60*60,
+            path="/"
+        )
+        
+        return {"user": user.model_dump(), "success": True}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @api_router.get("/auth/me")
 async def get_me(user: User = Depends(get_current_user)):
-    return user
+    return json_response(user.model_dump())
 
 @api_router.post("/auth/logout")
 async def logout(request: Request, response: Response, user: User = Depends(get_current_user)):
-    session_token = request.cookies.get('session_token')
+    session_token = get_session_token(request)
     if session_token:
+        session_cache.evict(session_token)
         await db.user_sessions.delete_one({"session_token": session_token})
     response.delete_cookie("session_token", path="/")
     return {"success": True}
 
 # Profile Routes
+async def load_profile(user_id: str) -> Dict[str, Any]:
+    profile = await db.user_profiles.find_one({"user_id": user_id}, {"_id": 0})
+    if profile:
+        return profile
+    # First access only: $setOnInsert keeps concurrent first requests from
+    # overwriting each other or a profile written in between
+    return await db.user_profiles.find_one_and_update(
+        {"user_id": user_id},
+        {"$setOnInsert": UserProfile(user_id=user_id).model_dump()},
+        projection={"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
 @api_router.get("/profile", response_model=UserProfile)
 async def get_profile(user: User = Depends(get_current_user)):
-    profile = await db.user_profiles.find_one({"user_id": user.id}, {"_id": 0})
-    if not profile:
-        profile = UserProfile(user_id=user.id).model_dump()
-        await db.user_profiles.insert_one(profile)
-    return UserProfile(**profile)
+    # response_model validates and filters the document once
+    return await load_profile(user.id)
+
+async def set_profile_fields(user_id: str, fields: Dict[str, Any]):
+    if 'prakriti_type' not in fields:
+        await db.user_profiles.update_one({"user_id": user_id}, {"$set": fields}, upsert=True)
+        return
+    
+    # Changing prakriti_type moves the user between stats buckets
+    previous = await db.user_profiles.find_one_and_update(
+        {"user_id": user_id},
+        {"$set": fields},
+        projection={"_id": 0, "prakriti_type": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    previous_type = previous.get('prakriti_type') if previous else None
+    if previous_type != fields['prakriti_type']:
+        # Denormalized onto users so the admin listing can filter without a join
+        await db.users.update_one({"id": user_id}, {"$set": {"prakriti_type": fields['prakriti_type']}})
+        session_cache.evict_user(user_id)
+        event_bus.publish("admin", {"type": "prakriti_changed", "user_id": user_id, "prakriti_type": fields['prakriti_type']})
+    await bump_stats(prakriti_transition(previous_type, fields['prakriti_type']))
 
 @api_router.put("/profile")
 async def update_profile(profile_data: Dict[str, Any], user: User = Depends(get_current_user)):
     profile_data['user_id'] = user.id
     profile_data['updated_at'] = datetime.now(timezone.utc).isoformat()
     
-    await db.user_profiles.update_one(
-        {"user_id": user.id},
-        {"$set": profile_data},
-        upsert=True
-    )
+    await set_profile_fields(user.id, profile_data)
     return {"success": True}
 
 # Prakriti Analysis
@@ -216,35 +608,260 @@ PRAKRITI_QUESTIONS = [
     {"question": "Your decision-making is:", "options": ["Quick, changeable (Vata)", "Decisive, confident (Pitta)", "Slow, methodical (Kapha)"], "category": "mental"}
 ]
 
-@api_router.get("/prakriti/questions")
-async def get_prakriti_questions():
-    return PRAKRITI_QUESTIONS
+# Dosha scoring engine
+# PRAKRITI_QUESTIONS is compiled once into a matrix with one row of dosha weights
+# per option (plus a zero row for unanswered questions), so answers become row
+# indices and scoring any number of submissions is a single gather + sum.
+# Options are weighted one-hot by their "(Dosha)" tag unless listed in
+# DOSHA_WEIGHT_OVERRIDES.
+DOSHA_WEIGHT_OVERRIDES: Dict[str, Dict[str, int]] = {}
 
-@api_router.post("/prakriti/analyze")
-async def analyze_prakriti(response_data: PrakritiResponse, user: User = Depends(get_current_user)):
-    answers = response_data.answers
-    
-    # Count dosha types
-    vata_count = sum(1 for ans in answers.values() if 'Vata' in ans)
-    pitta_count = sum(1 for ans in answers.values() if 'Pitta' in ans)
-    kapha_count = sum(1 for ans in answers.values() if 'Kapha' in ans)
+def option_weights(option: str) -> List[int]:
+    if option in DOSHA_WEIGHT_OVERRIDES:
+        return [DOSHA_WEIGHT_OVERRIDES[option].get(dosha, 0) for dosha in DOSHAS]
+    return [1 if dosha in option else 0 for dosha in DOSHAS]
+
+class DoshaScorer:
+    def __init__(self, questions: List[Dict[str, Any]]):
+        rows = []
+        self.offsets = []
+        self.option_lookup: List[Dict[str, int]] = []
+        for question in questions:
+            self.offsets.append(len(rows))
+            self.option_lookup.append({option: i for i, option in enumerate(question['options'])})
+            rows.extend(option_weights(option) for option in question['options'])
+        self.blank_row = len(rows)
+        rows.append([0] * len(DOSHAS))
+        self.weights = np.array(rows, dtype=np.int32)
+        self.offsets = np.array(self.offsets, dtype=np.int64)
+        self.question_count = len(questions)
+
+    def answer_options(self, answers: Dict[str, str]) -> List[int]:
+        # Per-question option index, -1 when unanswered
+        options = [-1] * self.question_count
+        for key, answer in answers.items():
+            if key.isdigit() and int(key) < self.question_count:
+                options[int(key)] = self.option_lookup[int(key)].get(answer, -1)
+        return options
+
+    def score_batch(self, answer_options: np.ndarray) -> np.ndarray:
+        answer_options = np.asarray(answer_options, dtype=np.int64).reshape(-1, self.question_count)
+        rows = np.where(answer_options >= 0, self.offsets + answer_options, self.blank_row)
+        return self.weights[rows].sum(axis=1)
+
+    def unmatched_answers(self, answers: Dict[str, str], options: List[int]) -> Dict[str, str]:
+        # Answers that are not one of the listed options; stored so rescoring can replay them
+        return {
+            key: answer for key, answer in answers.items()
+            if not (key.isdigit() and int(key) < self.question_count and options[int(key)] >= 0)
+        }
     
-    # Determine primary dosha
-    counts = {'Vata': vata_count, 'Pitta': pitta_count, 'Kapha': kapha_count}
-    primary_dosha = max(counts, key=counts.get)
+    def unmatched_weights(self, unmatched: Dict[str, str]) -> np.ndarray:
+        # Unmatched answers keep the old "(Dosha)" tag matching
+        totals = np.zeros(len(DOSHAS), dtype=np.int32)
+        for answer in unmatched.values():
+            totals += np.array(option_weights(answer), dtype=np.int32)
+        return totals
     
-    # AI Analysis
+    def score(self, answers: Dict[str, str]) -> tuple:
+        options = self.answer_options(answers)
+        unmatched = self.unmatched_answers(answers, options)
+        totals = self.score_batch(np.array([options]))[0] + self.unmatched_weights(unmatched)
+        return {dosha: int(total) for dosha, total in zip(DOSHAS, totals)}, options, unmatched
+
+dosha_scorer = DoshaScorer(PRAKRITI_QUESTIONS)
+
+PRAKRITI_QUESTIONS_PAYLOAD = dump_json(PRAKRITI_QUESTIONS)
+
+@api_router.get("/prakriti/questions")
+async def get_prakriti_questions():
+    return Response(content=PRAKRITI_QUESTIONS_PAYLOAD, media_type="application/json")
+
+# LLM admission control
+# Every provider call goes through a global concurrency limit with a bounded
+# wait queue, a per-call timeout and a circuit breaker. While the breaker is
+# open (or the queue is full) callers get LlmUnavailable and fall back to the
+# deterministic DOSHA_SUMMARIES text. A per-user token bucket caps how often a
+# single user can trigger a fresh LLM call.
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '8'))
+LLM_MAX_QUEUE = int(os.environ.get('LLM_MAX_QUEUE', '32'))
+LLM_CALL_TIMEOUT = float(os.environ.get('LLM_CALL_TIMEOUT', '20'))
+LLM_BREAKER_FAILURES = int(os.environ.get('LLM_BREAKER_FAILURES', '5'))
+LLM_BREAKER_COOLDOWN = float(os.environ.get('LLM_BREAKER_COOLDOWN', '30'))
+LLM_USER_BURST = float(os.environ.get('LLM_USER_BURST', '5'))
+LLM_USER_REFILL_PER_MINUTE = float(os.environ.get('LLM_USER_REFILL_PER_MINUTE', '1'))
+
+class LlmUnavailable(Exception):
+    pass
+
+class LlmAdmission:
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.in_flight = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise LlmUnavailable("LLM wait queue is full")
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_total = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = "half_open"
+        if self.state == "half_open":
+            # Let exactly one probe call through until it reports back
+            if self._probing:
+                return False
+            self._probing = True
+        return self.state != "open"
+
+    def release_probe(self):
+        self._probing = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opened_total += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+class TokenBuckets:
+    def __init__(self, burst: float, refill_per_second: float, maxsize: int = 10000):
+        self.burst = burst
+        self.refill_per_second = refill_per_second
+        self.maxsize = maxsize
+        self.rejected = 0
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def allow(self, key: str) -> bool:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.refill_per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.rejected += 1
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return allowed
+
+llm_admission = LlmAdmission(LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE)
+llm_breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN)
+llm_user_buckets = TokenBuckets(LLM_USER_BURST, LLM_USER_REFILL_PER_MINUTE / 60)
+llm_fallbacks = 0
+
+async def call_llm(chat: LlmChat, message: UserMessage) -> str:
+    if not llm_breaker.allow():
+        llm_call_duration.observe(("breaker_open",), 0)
+        raise LlmUnavailable("LLM circuit breaker is open")
+    started = time.perf_counter()
+    try:
+        async with llm_admission.slot():
+            started = time.perf_counter()
+            result = await asyncio.wait_for(chat.send_message(message), timeout=LLM_CALL_TIMEOUT)
+    except LlmUnavailable:
+        # Rejected before reaching the provider; not a provider failure
+        llm_breaker.release_probe()
+        llm_call_duration.observe(("rejected",), 0)
+        raise
+    except asyncio.TimeoutError:
+        llm_breaker.record_failure()
+        llm_call_duration.observe(("timeout",), time.perf_counter() - started)
+        raise
+    except Exception:
+        llm_breaker.record_failure()
+        llm_call_duration.observe(("error",), time.perf_counter() - started)
+        raise
+    llm_breaker.record_success()
+    llm_call_duration.observe(("ok",), time.perf_counter() - started)
+    llm_tokens_estimated.inc(("prompt",), len(message.text) // 4)
+    llm_tokens_estimated.inc(("completion",), len(result) // 4)
+    return result
+
+DOSHA_SUMMARIES = {
+    "Vata": "Vata, the energy of air and space, governs movement in the body and mind. People with a Vata constitution tend to be light, quick-thinking and creative, with a tendency towards dryness, cold hands and feet, and variable energy. Warm, grounding routines, regular meals and plenty of rest help keep Vata in balance.",
+    "Pitta": "Pitta, the energy of fire and water, governs digestion and transformation. People with a Pitta constitution tend to be focused, driven and sharp, with strong appetite and warm body temperature, and can become irritable when out of balance. Cooling foods, moderation and time to unwind help keep Pitta in balance.",
+    "Kapha": "Kapha, the energy of earth and water, governs structure and stability. People with a Kapha constitution tend to be calm, steady and compassionate, with strong endurance and deep sleep, and can feel sluggish when out of balance. Light, warm meals, regular vigorous activity and variety help keep Kapha in balance.",
+}
+
+def fallback_insights(counts: Dict[str, int], primary_dosha: str) -> str:
+    global llm_fallbacks
+    llm_fallbacks += 1
+    scores = ", ".join(f"{dosha} {counts[dosha]}" for dosha in DOSHAS)
+    return f"{DOSHA_SUMMARIES[primary_dosha]} Your scores: {scores}."
+
+def llm_metrics() -> Dict[str, Any]:
+    return {
+        "in_flight": llm_admission.in_flight,
+        "queue_depth": llm_admission.waiting,
+        "queue_rejections": llm_admission.rejected,
+        "user_rate_limited": llm_user_buckets.rejected,
+        "breaker_state": llm_breaker.state,
+        "breaker_failures": llm_breaker.failures,
+        "breaker_opened_total": llm_breaker.opened_total,
+        "fallbacks": llm_fallbacks,
+    }
+
+# Prakriti insight cache
+# The insight prompt depends only on the dosha counts, so generated insights
+# are stored per score vector in prakriti_insights with an in-memory front.
+# Concurrent misses for the same vector share one LLM call. The stored
+# insights for the current prompt version are preloaded at startup.
+INSIGHT_PROMPT_VERSION = "v1"
+insight_memory: Dict[str, str] = {}
+_insight_inflight: Dict[str, asyncio.Future] = {}
+
+def primary_dosha_for(counts: Dict[str, int]) -> str:
+    return max(counts, key=counts.get)
+
+def insight_key(counts: Dict[str, int]) -> str:
+    return f"{INSIGHT_PROMPT_VERSION}:{counts['Vata']}-{counts['Pitta']}-{counts['Kapha']}"
+
+async def generate_insights(counts: Dict[str, int], primary_dosha: str) -> str:
     chat = LlmChat(
         api_key=EMERGENT_LLM_KEY,
-        session_id=f"prakriti_{user.id}",
+        session_id=f"prakriti_{counts['Vata']}_{counts['Pitta']}_{counts['Kapha']}",
         system_message="You are an Ayurvedic practitioner providing personalized health insights based on Prakriti analysis."
     ).with_model("openai", "gpt-4o-mini")
     
     user_message = UserMessage(
         text=f"""Based on the following Prakriti assessment results:
-        Vata score: {vata_count}/10
-        Pitta score: {pitta_count}/10
-        Kapha score: {kapha_count}/10
+        Vata score: {counts['Vata']}/10
+        Pitta score: {counts['Pitta']}/10
+        Kapha score: {counts['Kapha']}/10
         Primary Dosha: {primary_dosha}
         
         Provide a brief, personalized analysis (3-4 sentences) explaining:
@@ -255,203 +872,1219 @@ async def analyze_prakriti(response_data: PrakritiResponse, user: User = Depends
         Keep it warm, encouraging, and easy to understand."""
     )
     
-    ai_analysis = await chat.send_message(user_message)
+    return await call_llm(chat, user_message)
+
+async def preload_insights():
+    prefix = re.escape(f"{INSIGHT_PROMPT_VERSION}:")
+    async for cached in db.prakriti_insights.find({"_id": {"$regex": f"^{prefix}"}}, {"insights": 1}):
+        insight_memory[cached['_id']] = cached['insights']
+
+async def load_cached_insights(key: str) -> Optional[str]:
+    cached = insight_memory.get(key)
+    if cached is not None:
+        return cached
+    # Another process (or warm-insights) may have stored it since startup
+    stored = await db.prakriti_insights.find_one({"_id": key}, {"insights": 1})
+    if stored:
+        insight_memory[key] = stored['insights']
+        return stored['insights']
+    return None
+
+async def _load_or_generate_insights(key: str, counts: Dict[str, int], primary_dosha: str) -> str:
+    cached = await load_cached_insights(key)
+    if cached is not None:
+        return cached
+    
+    insights = await generate_insights(counts, primary_dosha)
+    await db.prakriti_insights.update_one(
+        {"_id": key},
+        {"$set": {
+            "insights": insights,
+            "scores": counts,
+            "prakriti_type": primary_dosha,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }},
+        upsert=True
+    )
+    insight_memory[key] = insights
+    return insights
+
+async def get_insights(counts: Dict[str, int], primary_dosha: str) -> str:
+    key = insight_key(counts)
+    cached = insight_memory.get(key)
+    if cached is not None:
+        return cached
+    
+    task = _insight_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_load_or_generate_insights(key, counts, primary_dosha))
+        _insight_inflight[key] = task
+        task.add_done_callback(lambda _: _insight_inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+async def save_prakriti_analysis(user_id: str, analysis_result: Dict[str, Any]):
+    await set_profile_fields(user_id, {
+        "prakriti_type": analysis_result['prakriti_type'],
+        "prakriti_analysis": analysis_result,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    })
+
+@api_router.post("/prakriti/analyze")
+async def analyze_prakriti(response_data: PrakritiResponse, mode: str = "sync", user: User = Depends(get_current_user)):
+    # Count dosha types
+    counts, answer_options, unmatched_answers = dosha_scorer.score(response_data.answers)
+    
+    # Determine primary dosha
+    primary_dosha = primary_dosha_for(counts)
+    
+    # Only a vector with no stored insights costs an LLM call, and a token
+    if await load_cached_insights(insight_key(counts)) is None and not llm_user_buckets.allow(user.id):
+        raise HTTPException(status_code=429, detail="Too many analyses, please try again later")
+    
+    if mode == "async":
+        return await submit_prakriti_job(user.id, counts, primary_dosha, answer_options, unmatched_answers)
+    
+    # AI Analysis
+    try:
+        ai_analysis = await get_insights(counts, primary_dosha)
+        insights_source = "ai"
+    except Exception as e:
+        logger.warning(f"Using fallback Prakriti insights: {e}")
+        ai_analysis = fallback_insights(counts, primary_dosha)
+        insights_source = "fallback"
     
     analysis_result = {
         "prakriti_type": primary_dosha,
         "scores": counts,
         "ai_insights": ai_analysis,
+        "insights_source": insights_source,
+        "answer_options": answer_options,
+        "unmatched_answers": unmatched_answers,
         "analyzed_at": datetime.now(timezone.utc).isoformat()
     }
     
     # Update user profile
-    await db.user_profiles.update_one(
-        {"user_id": user.id},
-        {"$set": {
-            "prakriti_type": primary_dosha,
-            "prakriti_analysis": analysis_result,
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }},
-        upsert=True
-    )
+    await save_prakriti_analysis(user.id, analysis_result)
     
     return analysis_result
 
-# Diet Chart Routes
-@api_router.get("/diet-plan")
-async def get_diet_plan(user: User = Depends(get_current_user)):
-    profile = await db.user_profiles.find_one({"user_id": user.id})
-    if not profile or not profile.get('prakriti_type'):
-        raise HTTPException(status_code=400, detail="Please complete Prakriti analysis first")
+# Prakriti Analysis Jobs
+# In async mode the deterministic scores are saved and returned immediately and
+# ai_insights is filled in by a bounded pool of workers. Jobs live in
+# prakriti_jobs; a worker claims one with a lease, and the sweeper re-queues
+# pending jobs and jobs whose lease expired (e.g. the worker process died).
+# A job whose lease expires on its last attempt is marked failed.
+PRAKRITI_JOB_WORKERS = int(os.environ.get('PRAKRITI_JOB_WORKERS', '4'))
+PRAKRITI_JOB_QUEUE_SIZE = int(os.environ.get('PRAKRITI_JOB_QUEUE_SIZE', '100'))
+PRAKRITI_JOB_LEASE = int(os.environ.get('PRAKRITI_JOB_LEASE', '120'))
+PRAKRITI_JOB_MAX_ATTEMPTS = int(os.environ.get('PRAKRITI_JOB_MAX_ATTEMPTS', '3'))
+PRAKRITI_JOB_SWEEP_INTERVAL = float(os.environ.get('PRAKRITI_JOB_SWEEP_INTERVAL', '15'))
+PRAKRITI_JOB_POLL_INTERVAL = float(os.environ.get('PRAKRITI_JOB_POLL_INTERVAL', '2'))
+PRAKRITI_JOB_FINAL_STATES = ("done", "failed")
+PRAKRITI_JOB_SWEEP_SORT = [("created_at", ASCENDING)]
+
+prakriti_job_queue: Optional[asyncio.Queue] = None
+_queued_jobs: set = set()
+_job_events: Dict[str, asyncio.Event] = {}
+_job_tasks: List[asyncio.Task] = []
+
+def enqueue_prakriti_job(job_id: str) -> bool:
+    if prakriti_job_queue is None or job_id in _queued_jobs:
+        return False
+    try:
+        prakriti_job_queue.put_nowait(job_id)
+    except asyncio.QueueFull:
+        # Left pending in Mongo; the sweeper retries once the queue drains
+        return False
+    _queued_jobs.add(job_id)
+    return True
+
+def _notify_job(job_id: str):
+    event = _job_events.pop(job_id, None)
+    if event:
+        event.set()
+
+def _claimable_job_states(now: datetime) -> List[Dict[str, Any]]:
+    return [
+        {"status": "pending"},
+        {"status": "running", "lease_expires_at": {"$lt": now}}
+    ]
+
+def _runnable_jobs_query(now: datetime) -> Dict[str, Any]:
+    return {"attempts": {"$lt": PRAKRITI_JOB_MAX_ATTEMPTS}, "$or": _claimable_job_states(now)}
+
+def _exhausted_jobs_query(now: datetime) -> Dict[str, Any]:
+    return {"attempts": {"$gte": PRAKRITI_JOB_MAX_ATTEMPTS}, "$or": _claimable_job_states(now)}
+
+async def submit_prakriti_job(
+    user_id: str,
+    counts: Dict[str, int],
+    primary_dosha: str,
+    answer_options: List[int],
+    unmatched_answers: Dict[str, str]
+) -> Dict[str, Any]:
+    job = PrakritiJob(user_id=user_id, prakriti_type=primary_dosha, scores=counts)
+    await db.prakriti_jobs.insert_one(job.model_dump())
     
-    diet_plan = await db.diet_plans.find_one({"user_id": user.id}, {"_id": 0})
-    if diet_plan:
-        return diet_plan
-    
-    # Generate diet plan
-    prakriti = profile['prakriti_type']
-    diet_recommendations = {
-        "Vata": {
-            "recommended_foods": ["Warm, cooked foods", "Root vegetables", "Nuts and seeds", "Ghee and oils", "Sweet fruits", "Warm milk", "Rice and wheat"],
-            "avoid_foods": ["Cold foods", "Raw vegetables", "Dry foods", "Beans (except mung)", "Caffeine", "Carbonated drinks"],
-            "meal_timings": {"breakfast": "7:00-8:00 AM", "lunch": "12:00-1:00 PM", "dinner": "6:00-7:00 PM"},
-            "seasonal_tips": ["Eat warm, nourishing soups in winter", "Favor sweet, sour, and salty tastes", "Stay hydrated with warm water"]
-        },
-        "Pitta": {
-            "recommended_foods": ["Cool, refreshing foods", "Sweet fruits", "Leafy greens", "Cucumber", "Coconut", "Dairy products", "Barley and oats"],
-            "avoid_foods": ["Spicy foods", "Citrus fruits", "Tomatoes", "Fermented foods", "Red meat", "Alcohol", "Fried foods"],
-            "meal_timings": {"breakfast": "7:30-8:30 AM", "lunch": "12:00-1:00 PM", "dinner": "6:30-7:30 PM"},
-            "seasonal_tips": ["Eat cooling foods in summer", "Favor sweet, bitter, and astringent tastes", "Avoid eating when angry or stressed"]
-        },
-        "Kapha": {
-            "recommended_foods": ["Light, warm foods", "Bitter vegetables", "Legumes", "Spices (ginger, turmeric)", "Honey", "Quinoa and millet", "Apples and pears"],
-            "avoid_foods": ["Heavy, oily foods", "Dairy products", "Sweet fruits", "Wheat", "Cold foods", "Excessive salt"],
-            "meal_timings": {"breakfast": "7:00-8:00 AM (light)", "lunch": "12:00-1:00 PM (main meal)", "dinner": "6:00-6:30 PM (light)"},
-            "seasonal_tips": ["Eat lighter meals in spring", "Favor pungent, bitter, and astringent tastes", "Skip breakfast if not hungry"]
-        }
+    analysis_result = {
+        "prakriti_type": primary_dosha,
+        "scores": counts,
+        "ai_insights": None,
+        "insights_status": "pending",
+        "job_id": job.id,
+        "answer_options": answer_options,
+        "unmatched_answers": unmatched_answers,
+        "analyzed_at": datetime.now(timezone.utc).isoformat()
     }
+    await save_prakriti_analysis(user_id, analysis_result)
+    enqueue_prakriti_job(job.id)
+    return analysis_result
+
+async def run_prakriti_job(job_id: str):
+    now = datetime.now(timezone.utc)
+    job = await db.prakriti_jobs.find_one_and_update(
+        {"id": job_id, **_runnable_jobs_query(now)},
+        {"$set": {
+            "status": "running",
+            "lease_expires_at": now + timedelta(seconds=PRAKRITI_JOB_LEASE),
+            "updated_at": now
+        }, "$inc": {"attempts": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not job:
+        return
     
-    recommendations = diet_recommendations[prakriti]
-    diet_plan_obj = DietPlan(
-        user_id=user.id,
-        prakriti_type=prakriti,
-        **recommendations
+    insights_source = "ai"
+    try:
+        insights = await get_insights(job['scores'], job['prakriti_type'])
+    except Exception as e:
+        if job['attempts'] < PRAKRITI_JOB_MAX_ATTEMPTS:
+            logger.warning(f"Prakriti job {job_id} failed (attempt {job['attempts']}), will retry: {e}")
+            await db.prakriti_jobs.update_one(
+                {"id": job_id},
+                {"$set": {"status": "pending", "error": str(e), "lease_expires_at": None, "updated_at": datetime.now(timezone.utc)}}
+            )
+            return
+        logger.warning(f"Prakriti job {job_id} out of attempts, using fallback insights: {e}")
+        insights = fallback_insights(job['scores'], job['prakriti_type'])
+        insights_source = "fallback"
+    
+    # Only fill in the analysis this job was created for; a newer submission wins
+    await db.user_profiles.update_one(
+        {"user_id": job['user_id'], "prakriti_analysis.job_id": job_id},
+        {"$set": {
+            "prakriti_analysis.ai_insights": insights,
+            "prakriti_analysis.insights_source": insights_source,
+            "prakriti_analysis.insights_status": "done",
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    await db.prakriti_jobs.update_one(
+        {"id": job_id},
+        {"$set": {
+            "status": "done",
+            "ai_insights": insights,
+            "insights_source": insights_source,
+            "error": None,
+            "lease_expires_at": None,
+            "updated_at": datetime.now(timezone.utc)
+        }}
+    )
+    _notify_job(job_id)
+
+async def fail_exhausted_prakriti_jobs() -> int:
+    failed = 0
+    while True:
+        now = datetime.now(timezone.utc)
+        job = await db.prakriti_jobs.find_one_and_update(
+            _exhausted_jobs_query(now),
+            {"$set": {
+                "status": "failed",
+                "error": f"Gave up after {PRAKRITI_JOB_MAX_ATTEMPTS} attempts",
+                "lease_expires_at": None,
+                "updated_at": now
+            }},
+            projection={"_id": 0, "id": 1, "user_id": 1},
+            sort=PRAKRITI_JOB_SWEEP_SORT
+        )
+        if not job:
+            return failed
+        failed += 1
+        logger.warning(f"Prakriti job {job['id']} out of attempts, marked failed")
+        await db.user_profiles.update_one(
+            {"user_id": job['user_id'], "prakriti_analysis.job_id": job['id']},
+            {"$set": {
+                "prakriti_analysis.insights_status": "failed",
+                "updated_at": now.isoformat()
+            }}
+        )
+        _notify_job(job['id'])
+
+async def _prakriti_job_worker():
+    while True:
+        job_id = await prakriti_job_queue.get()
+        _queued_jobs.discard(job_id)
+        try:
+            await run_prakriti_job(job_id)
+        except Exception:
+            logger.exception(f"Prakriti job worker crashed on {job_id}")
+        finally:
+            prakriti_job_queue.task_done()
+
+async def _prakriti_job_sweeper():
+    while True:
+        try:
+            await fail_exhausted_prakriti_jobs()
+            cursor = db.prakriti_jobs.find(
+                _runnable_jobs_query(datetime.now(timezone.utc)), {"_id": 0, "id": 1}
+            ).sort(PRAKRITI_JOB_SWEEP_SORT).limit(PRAKRITI_JOB_QUEUE_SIZE)
+            async for job in cursor:
+                if prakriti_job_queue.full():
+                    break
+                enqueue_prakriti_job(job['id'])
+        except Exception:
+            logger.exception("Prakriti job sweep failed")
+        await asyncio.sleep(PRAKRITI_JOB_SWEEP_INTERVAL)
+
+async def start_prakriti_workers():
+    global prakriti_job_queue
+    prakriti_job_queue = asyncio.Queue(maxsize=PRAKRITI_JOB_QUEUE_SIZE)
+    for _ in range(PRAKRITI_JOB_WORKERS):
+        _job_tasks.append(asyncio.create_task(_prakriti_job_worker()))
+    _job_tasks.append(asyncio.create_task(_prakriti_job_sweeper()))
+
+async def stop_prakriti_workers():
+    for task in _job_tasks:
+        task.cancel()
+    await asyncio.gather(*_job_tasks, return_exceptions=True)
+    _job_tasks.clear()
+
+async def _find_prakriti_job(job_id: str, user_id: str) -> Dict[str, Any]:
+    job = await db.prakriti_jobs.find_one(
+        {"id": job_id, "user_id": user_id},
+        {"_id": 0, "id": 1, "status": 1, "prakriti_type": 1, "scores": 1, "ai_insights": 1, "error": 1}
     )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@api_router.get("/prakriti/jobs/{job_id}")
+async def get_prakriti_job(job_id: str, user: User = Depends(get_current_user)):
+    return await _find_prakriti_job(job_id, user.id)
+
+@api_router.get("/prakriti/jobs/{job_id}/events")
+async def stream_prakriti_job(job_id: str, request: Request, user: User = Depends(get_current_user)):
+    job = await _find_prakriti_job(job_id, user.id)
     
-    await db.diet_plans.insert_one(diet_plan_obj.model_dump())
-    return diet_plan_obj.model_dump()
+    async def event_stream():
+        current = job
+        last_status = None
+        while True:
+            if current['status'] != last_status:
+                last_status = current['status']
+                yield f"data: {json.dumps(current)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            if current['status'] in PRAKRITI_JOB_FINAL_STATES or await request.is_disconnected():
+                return
+            event = _job_events.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout=PRAKRITI_JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            current = await _find_prakriti_job(job_id, user.id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Plan Templates
+# Diet plans and daily schedules depend only on the prakriti type, so each
+# variant is serialized once at startup with a strong ETag. Users no longer get
+# a stored copy; diet_plans/daily_schedules only hold per-user overrides
+# ({user_id, prakriti_type, template_version, overrides}) or legacy full copies.
+PLAN_TEMPLATE_VERSION = 1
+PLAN_CACHE_CONTROL = "private, no-cache"
+
+DIET_RECOMMENDATIONS = {
+    "Vata": {
+        "recommended_foods": ["Warm, cooked foods", "Root vegetables", "Nuts and seeds", "Ghee and oils", "Sweet fruits", "Warm milk", "Rice and wheat"],
+        "avoid_foods": ["Cold foods", "Raw vegetables", "Dry foods", "Beans (except mung)", "Caffeine", "Carbonated drinks"],
+        "meal_timings": {"breakfast": "7:00-8:00 AM", "lunch": "12:00-1:00 PM", "dinner": "6:00-7:00 PM"},
+        "seasonal_tips": ["Eat warm, nourishing soups in winter", "Favor sweet, sour, and salty tastes", "Stay hydrated with warm water"]
+    },
+    "Pitta": {
+        "recommended_foods": ["Cool, refreshing foods", "Sweet fruits", "Leafy greens", "Cucumber", "Coconut", "Dairy products", "Barley and oats"],
+        "avoid_foods": ["Spicy foods", "Citrus fruits", "Tomatoes", "Fermented foods", "Red meat", "Alcohol", "Fried foods"],
+        "meal_timings": {"breakfast": "7:30-8:30 AM", "lunch": "12:00-1:00 PM", "dinner": "6:30-7:30 PM"},
+        "seasonal_tips": ["Eat cooling foods in summer", "Favor sweet, bitter, and astringent tastes", "Avoid eating when angry or stressed"]
+    },
+    "Kapha": {
+        "recommended_foods": ["Light, warm foods", "Bitter vegetables", "Legumes", "Spices (ginger, turmeric)", "Honey", "Quinoa and millet", "Apples and pears"],
+        "avoid_foods": ["Heavy, oily foods", "Dairy products", "Sweet fruits", "Wheat", "Cold foods", "Excessive salt"],
+        "meal_timings": {"breakfast": "7:00-8:00 AM (light)", "lunch": "12:00-1:00 PM (main meal)", "dinner": "6:00-6:30 PM (light)"},
+        "seasonal_tips": ["Eat lighter meals in spring", "Favor pungent, bitter, and astringent tastes", "Skip breakfast if not hungry"]
+    }
+}
+
+SCHEDULE_RECOMMENDATIONS = {
+    "Vata": {
+        "wake_time": "6:00 AM",
+        "sleep_time": "10:00 PM",
+        "activities": [
+            {"time": "6:00 AM", "activity": "Wake up, drink warm water"},
+            {"time": "6:30 AM", "activity": "Oil massage (Abhyanga) with sesame oil"},
+            {"time": "7:00 AM", "activity": "Gentle yoga and meditation (20 mins)"},
+            {"time": "8:00 AM", "activity": "Warm breakfast"},
+            {"time": "12:00 PM", "activity": "Main meal of the day"},
+            {"time": "3:00 PM", "activity": "Short walk or light activity"},
+            {"time": "6:30 PM", "activity": "Light dinner"},
+            {"time": "9:00 PM", "activity": "Relaxation routine, herbal tea"},
+            {"time": "10:00 PM", "activity": "Bedtime"}
+        ]
+    },
+    "Pitta": {
+        "wake_time": "5:30 AM",
+        "sleep_time": "10:30 PM",
+        "activities": [
+            {"time": "5:30 AM", "activity": "Wake up, drink cool water"},
+            {"time": "6:00 AM", "activity": "Coconut oil massage"},
+            {"time": "6:30 AM", "activity": "Moderate yoga and breathing exercises"},
+            {"time": "8:00 AM", "activity": "Nourishing breakfast"},
+            {"time": "12:00 PM", "activity": "Lunch (largest meal)"},
+            {"time": "4:00 PM", "activity": "Cooling walk in nature"},
+            {"time": "7:00 PM", "activity": "Light dinner"},
+            {"time": "9:30 PM", "activity": "Calming activities, avoid screens"},
+            {"time": "10:30 PM", "activity": "Bedtime"}
+        ]
+    },
+    "Kapha": {
+        "wake_time": "5:00 AM",
+        "sleep_time": "10:00 PM",
+        "activities": [
+            {"time": "5:00 AM", "activity": "Wake up, drink warm ginger water"},
+            {"time": "5:30 AM", "activity": "Vigorous exercise or yoga (30-40 mins)"},
+            {"time": "7:00 AM", "activity": "Dry brushing and warm shower"},
+            {"time": "8:00 AM", "activity": "Light breakfast (optional)"},
+            {"time": "12:00 PM", "activity": "Main meal with spices"},
+            {"time": "3:00 PM", "activity": "Active movement or brisk walk"},
+            {"time": "6:00 PM", "activity": "Very light dinner"},
+            {"time": "9:00 PM", "activity": "Light reading or relaxation"},
+            {"time": "10:00 PM", "activity": "Bedtime"}
+        ]
+    }
+}
+
+def compile_plan(kind: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    payload = json.dumps(body, separators=(",", ":")).encode()
+    digest = hashlib.sha256(payload).hexdigest()[:20]
+    return {
+        "body": body,
+        "payload": payload,
+        "etag": f'"{kind}-{body["prakriti_type"]}-v{PLAN_TEMPLATE_VERSION}-{digest}"'
+    }
+
+def compile_plan_templates(kind: str, recommendations: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        prakriti: compile_plan(kind, {"prakriti_type": prakriti, "template_version": PLAN_TEMPLATE_VERSION, **content})
+        for prakriti, content in recommendations.items()
+    }
+
+DIET_PLAN_TEMPLATES = compile_plan_templates("diet", DIET_RECOMMENDATIONS)
+DAILY_SCHEDULE_TEMPLATES = compile_plan_templates("schedule", SCHEDULE_RECOMMENDATIONS)
+
+def plan_overrides(template: Dict[str, Any], stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not stored or stored.get('prakriti_type') != template['body']['prakriti_type']:
+        return {}
+    if 'overrides' in stored:
+        return stored['overrides'] or {}
+    # Legacy full copy: keep only fields that differ from the template
+    return {
+        key: stored[key] for key, value in template['body'].items()
+        if key not in ("prakriti_type", "template_version") and stored.get(key) not in (None, value)
+    }
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def plan_response(request: Request, plan: Dict[str, Any]) -> Response:
+    headers = {"ETag": plan['etag'], "Cache-Control": PLAN_CACHE_CONTROL}
+    if etag_matches(request.headers.get('if-none-match'), plan['etag']):
+        return Response(status_code=304, headers=headers)
+    return Response(content=plan['payload'], media_type="application/json", headers=headers)
+
+async def get_user_prakriti(user: User) -> str:
+    # Read from the profile rather than the session-cached User: other workers
+    # and manage.py change it without evicting this process's cache
+    profile = await db.user_profiles.find_one({"user_id": user.id}, {"_id": 0, "prakriti_type": 1})
+    prakriti = profile.get('prakriti_type') if profile else None
+    if not prakriti:
+        raise HTTPException(status_code=400, detail="Please complete Prakriti analysis first")
+    return prakriti
+
+async def resolve_plan(kind: str, templates: Dict[str, Dict[str, Any]], collection: str, user: User) -> Dict[str, Any]:
+    prakriti, stored = await asyncio.gather(
+        get_user_prakriti(user),
+        db[collection].find_one({"user_id": user.id}, {"_id": 0})
+    )
+    template = templates[prakriti]
+    overrides = plan_overrides(template, stored)
+    if not overrides:
+        return template
+    return compile_plan(kind, {**template['body'], **overrides})
+
+def cached_template_response(request: Request, templates: Dict[str, Dict[str, Any]], user: User) -> Optional[Response]:
+    # Revalidation against the shared template needs no DB access at all. The
+    # cached prakriti_type can lag a change made in another worker by up to
+    # SESSION_CACHE_TTL, so it only ever confirms a 304; plan bodies are built
+    # from the profile in resolve_plan.
+    template = templates.get(user.prakriti_type)
+    if template and etag_matches(request.headers.get('if-none-match'), template['etag']):
+        return plan_response(request, template)
+    return None
+
+# Diet Chart Routes
+@api_router.get("/diet-plan")
+async def get_diet_plan(request: Request, user: User = Depends(get_current_user)):
+    cached = cached_template_response(request, DIET_PLAN_TEMPLATES, user)
+    if cached:
+        return cached
+    plan = await resolve_plan("diet", DIET_PLAN_TEMPLATES, "diet_plans", user)
+    return plan_response(request, plan)
 
 # Daily Schedule Routes
 @api_router.get("/daily-schedule")
-async def get_daily_schedule(user: User = Depends(get_current_user)):
-    profile = await db.user_profiles.find_one({"user_id": user.id})
-    if not profile or not profile.get('prakriti_type'):
-        raise HTTPException(status_code=400, detail="Please complete Prakriti analysis first")
-    
-    schedule = await db.daily_schedules.find_one({"user_id": user.id}, {"_id": 0})
-    if schedule:
-        return schedule
-    
-    # Generate daily schedule
-    prakriti = profile['prakriti_type']
-    schedule_recommendations = {
-        "Vata": {
-            "wake_time": "6:00 AM",
-            "sleep_time": "10:00 PM",
-            "activities": [
-                {"time": "6:00 AM", "activity": "Wake up, drink warm water"},
-                {"time": "6:30 AM", "activity": "Oil massage (Abhyanga) with sesame oil"},
-                {"time": "7:00 AM", "activity": "Gentle yoga and meditation (20 mins)"},
-                {"time": "8:00 AM", "activity": "Warm breakfast"},
-                {"time": "12:00 PM", "activity": "Main meal of the day"},
-                {"time": "3:00 PM", "activity": "Short walk or light activity"},
-                {"time": "6:30 PM", "activity": "Light dinner"},
-                {"time": "9:00 PM", "activity": "Relaxation routine, herbal tea"},
-                {"time": "10:00 PM", "activity": "Bedtime"}
-            ]
-        },
-        "Pitta": {
-            "wake_time": "5:30 AM",
-            "sleep_time": "10:30 PM",
-            "activities": [
-                {"time": "5:30 AM", "activity": "Wake up, drink cool water"},
-                {"time": "6:00 AM", "activity": "Coconut oil massage"},
-                {"time": "6:30 AM", "activity": "Moderate yoga and breathing exercises"},
-                {"time": "8:00 AM", "activity": "Nourishing breakfast"},
-                {"time": "12:00 PM", "activity": "Lunch (largest meal)"},
-                {"time": "4:00 PM", "activity": "Cooling walk in nature"},
-                {"time": "7:00 PM", "activity": "Light dinner"},
-                {"time": "9:30 PM", "activity": "Calming activities, avoid screens"},
-                {"time": "10:30 PM", "activity": "Bedtime"}
-            ]
-        },
-        "Kapha": {
-            "wake_time": "5:00 AM",
-            "sleep_time": "10:00 PM",
-            "activities": [
-                {"time": "5:00 AM", "activity": "Wake up, drink warm ginger water"},
-                {"time": "5:30 AM", "activity": "Vigorous exercise or yoga (30-40 mins)"},
-                {"time": "7:00 AM", "activity": "Dry brushing and warm shower"},
-                {"time": "8:00 AM", "activity": "Light breakfast (optional)"},
-                {"time": "12:00 PM", "activity": "Main meal with spices"},
-                {"time": "3:00 PM", "activity": "Active movement or brisk walk"},
-                {"time": "6:00 PM", "activity": "Very light dinner"},
-                {"time": "9:00 PM", "activity": "Light reading or relaxation"},
-                {"time": "10:00 PM", "activity": "Bedtime"}
-            ]
+async def get_daily_schedule(request: Request, user: User = Depends(get_current_user)):
+    cached = cached_template_response(request, DAILY_SCHEDULE_TEMPLATES, user)
+    if cached:
+        return cached
+    plan = await resolve_plan("schedule", DAILY_SCHEDULE_TEMPLATES, "daily_schedules", user)
+    return plan_response(request, plan)
+
+# Follow-up Routes
+# Follow-ups are paged newest first with a keyset cursor over (date, id). Each
+# insert also folds the entry into the user's follow_up_rollups document so
+# progress trends never rescan history.
+FOLLOW_UPS_PAGE_SIZE = 20
+FOLLOW_UPS_MAX_PAGE_SIZE = 100
+PROGRESS_ROLLING_WINDOW = 5
+PROGRESS_WEEKS = 12
+FOLLOW_UPS_SORT = [("date", DESCENDING), ("id", DESCENDING)]
+
+def _follow_ups_query(user_id: str, cursor: Optional[str] = None) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"user_id": user_id}
+    if cursor:
+        last_date, last_id = decode_page_cursor(cursor)
+        query["$or"] = [
+            {"date": {"$lt": last_date}},
+            {"date": last_date, "id": {"$lt": last_id}}
+        ]
+    return query
+
+async def load_follow_ups(user_id: str, limit: int = FOLLOW_UPS_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+    follow_ups = await db.follow_ups.find(_follow_ups_query(user_id, cursor), {"_id": 0}).sort(
+        FOLLOW_UPS_SORT
+    ).limit(limit + 1).to_list(limit + 1)
+    return page_follow_ups(follow_ups, limit)
+
+def page_follow_ups(follow_ups: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    # follow_ups holds up to limit + 1 entries; the extra one signals another page
+    next_cursor = None
+    if len(follow_ups) > limit:
+        follow_ups = follow_ups[:limit]
+        next_cursor = encode_page_cursor(follow_ups[-1]['date'], follow_ups[-1]['id'])
+    return {"follow_ups": follow_ups, "next_cursor": next_cursor}
+
+def progress_week(date: datetime) -> str:
+    year, week, _ = date.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def follow_up_rollup_update(follow_up: Dict[str, Any]) -> Dict[str, Any]:
+    week = f"weekly.{progress_week(follow_up['date'])}"
+    increments = {"count": 1, f"{week}.count": 1}
+    update: Dict[str, Any] = {
+        "$inc": increments,
+        "$max": {"last_date": follow_up['date']},
+        "$set": {"updated_at": datetime.now(timezone.utc)}
+    }
+    rating = follow_up.get('progress_rating')
+    if rating is not None:
+        increments.update({"rating_count": 1, "rating_sum": rating, f"{week}.rating_count": 1, f"{week}.rating_sum": rating})
+        # Kept sorted by date so late-synced entries land in the right place
+        update["$push"] = {"recent_ratings": {
+            "$each": [{"date": follow_up['date'], "rating": rating}],
+            "$sort": {"date": 1},
+            "$slice": -PROGRESS_ROLLING_WINDOW
+        }}
+    return update
+
+def build_follow_up_rollup(follow_ups: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # The document follow_up_rollup_update would have produced for these entries
+    rollup: Dict[str, Any] = {"count": 0, "weekly": {}}
+    ratings = []
+    for follow_up in follow_ups:
+        bucket = rollup["weekly"].setdefault(progress_week(follow_up['date']), {"count": 0})
+        rollup["count"] += 1
+        bucket["count"] += 1
+        if rollup.get("last_date") is None or follow_up['date'] > rollup["last_date"]:
+            rollup["last_date"] = follow_up['date']
+        rating = follow_up.get('progress_rating')
+        if rating is not None:
+            rollup["rating_count"] = rollup.get("rating_count", 0) + 1
+            rollup["rating_sum"] = rollup.get("rating_sum", 0) + rating
+            bucket["rating_count"] = bucket.get("rating_count", 0) + 1
+            bucket["rating_sum"] = bucket.get("rating_sum", 0) + rating
+            ratings.append({"date": follow_up['date'], "rating": rating})
+    if ratings:
+        rollup["recent_ratings"] = sorted(ratings, key=lambda entry: entry['date'])[-PROGRESS_ROLLING_WINDOW:]
+    rollup["updated_at"] = datetime.now(timezone.utc)
+    return rollup
+
+async def update_follow_up_rollup(follow_up: Dict[str, Any]):
+    await db.follow_up_rollups.update_one({"_id": follow_up['user_id']}, follow_up_rollup_update(follow_up), upsert=True)
+
+async def load_progress(user_id: str, weeks: int = PROGRESS_WEEKS) -> Dict[str, Any]:
+    rollup = await db.follow_up_rollups.find_one({"_id": user_id})
+    return summarize_progress(rollup, weeks)
+
+def summarize_progress(rollup: Optional[Dict[str, Any]], weeks: int = PROGRESS_WEEKS) -> Dict[str, Any]:
+    rollup = rollup or {}
+    rating_count = rollup.get('rating_count', 0)
+    recent = [entry['rating'] for entry in rollup.get('recent_ratings', [])]
+    weekly = [
+        {
+            "week": week,
+            "count": bucket.get('count', 0),
+            "average_rating": round(bucket['rating_sum'] / bucket['rating_count'], 2) if bucket.get('rating_count') else None
         }
+        for week, bucket in sorted(rollup.get('weekly', {}).items())[-weeks:]
+    ] if weeks else []
+    return {
+        "count": rollup.get('count', 0),
+        "rated_count": rating_count,
+        "average_rating": round(rollup['rating_sum'] / rating_count, 2) if rating_count else None,
+        "rolling_average_rating": round(sum(recent) / len(recent), 2) if recent else None,
+        "rolling_window": PROGRESS_ROLLING_WINDOW,
+        "last_date": rollup.get('last_date'),
+        "weekly": weekly
     }
-    
-    recommendations = schedule_recommendations[prakriti]
-    schedule_obj = DailySchedule(
-        user_id=user.id,
-        prakriti_type=prakriti,
-        **recommendations
-    )
-    
-    await db.daily_schedules.insert_one(schedule_obj.model_dump())
-    return schedule_obj.model_dump()
 
-# Follow-up Routes
 @api_router.get("/follow-ups")
-async def get_follow_ups(user: User = Depends(get_current_user)):
-    follow_ups = await db.follow_ups.find({"user_id": user.id}, {"_id": 0}).sort("date", -1).to_list(100)
-    return follow_ups
+async def get_follow_ups(
+    cursor: Optional[str] = None,
+    limit: int = Query(FOLLOW_UPS_PAGE_SIZE, ge=1, le=FOLLOW_UPS_MAX_PAGE_SIZE),
+    user: User = Depends(get_current_user)
+):
+    return json_response(await load_follow_ups(user.id, limit, cursor))
 
-@api_router.post("/follow-ups")
-async def create_follow_up(follow_up_data: Dict[str, Any], user: User = Depends(get_current_user)):
-    follow_up = FollowUp(
-        user_id=user.id,
+@api_router.get("/follow-ups/progress")
+async def get_follow_up_progress(weeks: int = Query(PROGRESS_WEEKS, ge=0, le=520), user: User = Depends(get_current_user)):
+    return await load_progress(user.id, weeks)
+
+def build_follow_up(user_id: str, follow_up_data: Dict[str, Any], **fields) -> FollowUp:
+    return FollowUp(
+        user_id=user_id,
         date=datetime.fromisoformat(follow_up_data['date']) if 'date' in follow_up_data else datetime.now(timezone.utc),
         notes=follow_up_data.get('notes'),
         progress_rating=follow_up_data.get('progress_rating'),
-        feedback=follow_up_data.get('feedback')
+        feedback=follow_up_data.get('feedback'),
+        **fields
+    )
+
+@api_router.post("/follow-ups")
+async def create_follow_up(follow_up_data: Dict[str, Any], user: User = Depends(get_current_user)):
+    follow_up = build_follow_up(user.id, follow_up_data)
+    follow_up_doc = follow_up.model_dump()
+    await db.follow_ups.insert_one(dict(follow_up_doc))
+    await asyncio.gather(
+        update_follow_up_rollup(follow_up_doc),
+        bump_stats({"total_follow_ups": 1})
     )
-    await db.follow_ups.insert_one(follow_up.model_dump())
-    return follow_up.model_dump()
+    return follow_up_doc
+
+# Bulk follow-up ingestion
+# Offline clinic sync posts many follow-ups at once as NDJSON or a JSON array.
+# Both are parsed incrementally from the request stream, validated record by
+# record and written in unordered chunks. Every record carries a
+# client-generated id, unique per user in follow_ups, so a retried batch
+# reports already-stored records as "duplicate" instead of inserting them twice.
+# Reading stops at FOLLOW_UP_BATCH_MAX records, FOLLOW_UP_BATCH_MAX_BYTES of
+# body or a record over FOLLOW_UP_BATCH_MAX_RECORD_BYTES; the response then
+# carries truncated_after (records processed) so the client resends the rest.
+FOLLOW_UP_BATCH_CHUNK = int(os.environ.get('FOLLOW_UP_BATCH_CHUNK', '500'))
+FOLLOW_UP_BATCH_MAX = int(os.environ.get('FOLLOW_UP_BATCH_MAX', '10000'))
+FOLLOW_UP_BATCH_MAX_BYTES = int(os.environ.get('FOLLOW_UP_BATCH_MAX_BYTES', str(16 * 1024 * 1024)))
+FOLLOW_UP_BATCH_MAX_RECORD_BYTES = int(os.environ.get('FOLLOW_UP_BATCH_MAX_RECORD_BYTES', str(64 * 1024)))
+DUPLICATE_KEY_ERROR = 11000
+FOLLOW_UP_IDEMPOTENCY_KEY = {"user_id": 1, "id": 1}
+JSON_WHITESPACE = " \t\r\n"
+
+class BatchTruncated(Exception):
+    pass
+
+async def _read_batch_body(request: Request):
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > FOLLOW_UP_BATCH_MAX_BYTES:
+            raise BatchTruncated(f"body exceeds {FOLLOW_UP_BATCH_MAX_BYTES} bytes")
+        yield chunk
+
+async def _iter_ndjson_records(chunks):
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        start = 0
+        end = buffer.find(b"\n")
+        while end != -1:
+            line = bytes(buffer[start:end])
+            if line.strip():
+                yield line
+            start = end + 1
+            end = buffer.find(b"\n", start)
+        del buffer[:start]
+        if len(buffer) > FOLLOW_UP_BATCH_MAX_RECORD_BYTES:
+            raise BatchTruncated(f"record exceeds {FOLLOW_UP_BATCH_MAX_RECORD_BYTES} bytes")
+    if bytes(buffer).strip():
+        yield bytes(buffer)
+
+async def _iter_json_array_records(chunks):
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = chunks.__aiter__()
+    buffer, pos, eof = "", 0, False
+    expect = "open"
+    while True:
+        while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+            pos += 1
+        if pos == len(buffer) or expect in ("first", "next") and buffer[pos] not in "]":
+            # Records are decoded in place; only read more once the tail is
+            # exhausted or holds an incomplete record
+            decoded = None
+            if pos < len(buffer):
+                try:
+                    decoded = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    pass
+            if decoded is not None:
+                record, pos = decoded
+                expect = "separator"
+                yield record
+                continue
+            if eof:
+                raise BatchTruncated("malformed JSON array")
+            # Keep only the unparsed tail, which holds at most one record
+            buffer, pos = buffer[pos:], 0
+            if len(buffer) > FOLLOW_UP_BATCH_MAX_RECORD_BYTES:
+                raise BatchTruncated(f"record exceeds {FOLLOW_UP_BATCH_MAX_RECORD_BYTES} bytes")
+            try:
+                buffer += utf8.decode(await chunks.__anext__())
+            except StopAsyncIteration:
+                buffer += utf8.decode(b"", final=True)
+                eof = True
+            continue
+        
+        char = buffer[pos]
+        pos += 1
+        if expect == "open" and char == "[":
+            expect = "first"
+        elif expect in ("first", "separator") and char == "]":
+            return
+        elif expect == "separator" and char == ",":
+            expect = "next"
+        else:
+            raise BatchTruncated("body must be a JSON array of objects or NDJSON")
+
+def _iter_batch_records(request: Request):
+    content_type = request.headers.get('content-type', '')
+    if 'ndjson' in content_type or 'jsonlines' in content_type:
+        return _iter_ndjson_records(_read_batch_body(request))
+    return _iter_json_array_records(_read_batch_body(request))
+
+def _parse_batch_record(user_id: str, raw: Any) -> Dict[str, Any]:
+    record = json.loads(raw) if isinstance(raw, bytes) else raw
+    if not isinstance(record, dict):
+        raise ValueError("record must be an object")
+    record_id = record.get('id')
+    if not isinstance(record_id, str) or not record_id.strip() or len(record_id) > 128:
+        raise ValueError("id must be a non-empty string of at most 128 characters")
+    return build_follow_up(user_id, record, id=record_id).model_dump()
+
+def _is_follow_up_duplicate(error: Dict[str, Any]) -> bool:
+    # Only a clash on this user's (user_id, id) makes a record a retry
+    if error.get('code') != DUPLICATE_KEY_ERROR:
+        return False
+    key_pattern = error.get('keyPattern')
+    if key_pattern is not None:
+        return dict(key_pattern) == FOLLOW_UP_IDEMPOTENCY_KEY
+    return "user_id_1_id_1" in error.get('errmsg', '')
+
+async def _write_follow_up_chunk(docs: List[Dict[str, Any]], results: List[Dict[str, Any]], positions: List[int]):
+    failed: Dict[int, Dict[str, Any]] = {}
+    try:
+        await db.follow_ups.insert_many([dict(doc) for doc in docs], ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get('writeErrors', []):
+            failed[error['index']] = error
+    
+    created = []
+    for i, doc in enumerate(docs):
+        result = results[positions[i]]
+        error = failed.get(i)
+        if error is None:
+            result['status'] = "created"
+            created.append(doc)
+        elif _is_follow_up_duplicate(error):
+            result['status'] = "duplicate"
+        else:
+            result['status'] = "error"
+            result['error'] = error.get('errmsg')
+    
+    if created:
+        rollups = [UpdateOne({"_id": doc['user_id']}, follow_up_rollup_update(doc), upsert=True) for doc in created]
+        await asyncio.gather(
+            db.follow_up_rollups.bulk_write(rollups),
+            bump_stats({"total_follow_ups": len(created)})
+        )
+
+@api_router.post("/follow-ups/batch")
+async def create_follow_ups_batch(request: Request, user: User = Depends(get_current_user)):
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > FOLLOW_UP_BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Batch body exceeds {FOLLOW_UP_BATCH_MAX_BYTES} bytes")
+    
+    results: List[Dict[str, Any]] = []
+    docs: List[Dict[str, Any]] = []
+    positions: List[int] = []
+    truncated_reason = None
+    
+    records = _iter_batch_records(request)
+    try:
+        async for raw in records:
+            index = len(results)
+            if index >= FOLLOW_UP_BATCH_MAX:
+                truncated_reason = f"more than {FOLLOW_UP_BATCH_MAX} records"
+                break
+            try:
+                doc = _parse_batch_record(user.id, raw)
+            except (ValueError, TypeError, KeyError) as e:
+                record_id = raw.get('id') if isinstance(raw, dict) else None
+                results.append({"index": index, "id": record_id, "status": "invalid", "error": str(e)})
+                continue
+            results.append({"index": index, "id": doc['id']})
+            docs.append(doc)
+            positions.append(index)
+            if len(docs) >= FOLLOW_UP_BATCH_CHUNK:
+                await _write_follow_up_chunk(docs, results, positions)
+                docs, positions = [], []
+    except BatchTruncated as e:
+        truncated_reason = str(e)
+    finally:
+        await records.aclose()
+    
+    if truncated_reason and not results:
+        raise HTTPException(status_code=400, detail=f"Invalid batch: {truncated_reason}")
+    if docs:
+        await _write_follow_up_chunk(docs, results, positions)
+    
+    summary = {status: 0 for status in ("created", "duplicate", "invalid", "error")}
+    for result in results:
+        summary[result['status']] += 1
+    return {
+        "summary": summary,
+        "results": results,
+        "truncated_after": len(results) if truncated_reason else None,
+        "truncated_reason": truncated_reason
+    }
+
+# Bootstrap
+# One authenticated request that gathers everything a page needs concurrently
+# instead of one round trip (and one auth check) per section.
+BOOTSTRAP_SECTIONS = ("user", "profile", "diet_plan", "daily_schedule", "follow_ups")
+
+async def _load_plan_body(kind: str, templates: Dict[str, Dict[str, Any]], collection: str, user: User) -> Optional[Dict[str, Any]]:
+    try:
+        plan = await resolve_plan(kind, templates, collection, user)
+    except HTTPException:
+        # No Prakriti analysis yet
+        return None
+    return plan['body']
+
+async def _load_user(user: User) -> Dict[str, Any]:
+    return user.model_dump()
+
+@api_router.get("/bootstrap")
+async def bootstrap(sections: Optional[str] = None, user: User = Depends(get_current_user)):
+    requested = [section.strip() for section in sections.split(",") if section.strip()] if sections else list(BOOTSTRAP_SECTIONS)
+    unknown = [section for section in requested if section not in BOOTSTRAP_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+    
+    loaders = {
+        "user": lambda: _load_user(user),
+        "profile": lambda: load_profile(user.id),
+        "diet_plan": lambda: _load_plan_body("diet", DIET_PLAN_TEMPLATES, "diet_plans", user),
+        "daily_schedule": lambda: _load_plan_body("schedule", DAILY_SCHEDULE_TEMPLATES, "daily_schedules", user),
+        "follow_ups": lambda: load_follow_ups(user.id),
+    }
+    requested = list(dict.fromkeys(requested))
+    results = await asyncio.gather(*(loaders[section]() for section in requested))
+    return json_response(dict(zip(requested, results)))
 
 # Admin Routes
+ADMIN_USERS_PAGE_SIZE = 50
+ADMIN_USERS_MAX_PAGE_SIZE = 200
+ADMIN_USER_FIELDS = ["id", "email", "name", "picture", "prakriti_type", "created_at"]
+ADMIN_USERS_SORT = [("created_at", ASCENDING), ("id", ASCENDING)]
+
+def encode_page_cursor(*values: Any) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_page_cursor(cursor: str) -> tuple:
+    # Every cursor is a (datetime, id) keyset; anything else is a client error
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != 2:
+            raise ValueError("cursor must hold two values")
+        timestamp, last_id = values
+        if not isinstance(timestamp, str) or not isinstance(last_id, str):
+            raise ValueError("cursor values must be strings")
+        return datetime.fromisoformat(timestamp), last_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Lower-cased copies of name and email kept on users for case-insensitive
+# prefix search; `python manage.py backfill-user-search` fills older documents.
+USER_DOC_PROJECTION = {"_id": 0, "name_lower": 0, "email_lower": 0}
+
+def user_search_fields(name: Optional[str], email: Optional[str]) -> Dict[str, Optional[str]]:
+    return {
+        "name_lower": name.lower() if name else None,
+        "email_lower": email.lower() if email else None
+    }
+
+def _admin_users_query(q: Optional[str], prakriti_type: Optional[str]) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if prakriti_type:
+        query["prakriti_type"] = prakriti_type
+    if q:
+        # Anchored, case-sensitive prefixes on the lower-cased copies so the
+        # name_lower and email_lower indexes can be used
+        prefix = re.escape(q.strip().lower())
+        query["$or"] = [
+            {"name_lower": {"$regex": f"^{prefix}"}},
+            {"email_lower": {"$regex": f"^{prefix}"}}
+        ]
+    return query
+
+def _admin_users_page_query(q: Optional[str], prakriti_type: Optional[str], cursor: Optional[str]) -> Dict[str, Any]:
+    query = _admin_users_query(q, prakriti_type)
+    if cursor:
+        created_at, last_id = decode_page_cursor(cursor)
+        query = {"$and": [query, {"$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "id": {"$gt": last_id}}
+        ]}]}
+    return query
+
 @api_router.get("/admin/users")
-async def get_all_users(user: User = Depends(get_current_user)):
-    users = await db.users.find({}, {"_id": 0}).to_list(1000)
-    return users
+async def get_all_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(ADMIN_USERS_PAGE_SIZE, ge=1, le=ADMIN_USERS_MAX_PAGE_SIZE),
+    q: Optional[str] = None,
+    prakriti_type: Optional[str] = None,
+    user: User = Depends(get_current_user)
+):
+    query = _admin_users_page_query(q, prakriti_type, cursor)
+    users = await db.users.find(query, USER_DOC_PROJECTION).sort(
+        ADMIN_USERS_SORT
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_page_cursor(users[-1]['created_at'], users[-1]['id'])
+    return json_response({"users": users, "next_cursor": next_cursor})
 
-@api_router.get("/admin/stats")
-async def get_admin_stats(user: User = Depends(get_current_user)):
-    total_users = await db.users.count_documents({})
-    profiles_completed = await db.user_profiles.count_documents({"prakriti_type": {"$exists": True}})
-    total_follow_ups = await db.follow_ups.count_documents({})
+@api_router.get("/admin/users/export")
+async def export_users(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    q: Optional[str] = None,
+    prakriti_type: Optional[str] = None,
+    user: User = Depends(get_current_user)
+):
+    projection = {"_id": 0, **{field: 1 for field in ADMIN_USER_FIELDS}}
+    cursor = db.users.find(_admin_users_query(q, prakriti_type), projection).sort(
+        ADMIN_USERS_SORT
+    ).batch_size(1000)
+    
+    async def ndjson_rows():
+        async for doc in cursor:
+            yield json.dumps(doc, default=str) + "\n"
+    
+    async def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=ADMIN_USER_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        async for doc in cursor:
+            writer.writerow(doc)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
     
-    # Prakriti distribution
-    vata_count = await db.user_profiles.count_documents({"prakriti_type": "Vata"})
-    pitta_count = await db.user_profiles.count_documents({"prakriti_type": "Pitta"})
-    kapha_count = await db.user_profiles.count_documents({"prakriti_type": "Kapha"})
+    if export_format == "csv":
+        body, media_type = csv_rows(), "text/csv"
+    else:
+        body, media_type = ndjson_rows(), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'}
+    )
+
+@api_router.get("/admin/session-cache")
+async def get_session_cache_stats(user: User = Depends(get_current_user)):
+    return session_cache.stats()
+
+@api_router.get("/admin/llm-metrics")
+async def get_llm_metrics(user: User = Depends(get_current_user)):
+    return llm_metrics()
+
+async def load_admin_stats() -> Dict[str, Any]:
+    counters = await db.stats_counters.find_one({"_id": STATS_COUNTERS_ID})
+    if not counters:
+        return await compute_admin_stats()
     
     return {
-        "total_users": total_users,
-        "profiles_completed": profiles_completed,
-        "total_follow_ups": total_follow_ups,
+        "total_users": counters.get('total_users', 0),
+        "profiles_completed": counters.get('profiles_completed', 0),
+        "total_follow_ups": counters.get('total_follow_ups', 0),
         "prakriti_distribution": {
-            "Vata": vata_count,
-            "Pitta": pitta_count,
-            "Kapha": kapha_count
+            dosha: counters.get('prakriti_distribution', {}).get(dosha, 0) for dosha in DOSHAS
         }
     }
 
-@api_router.get("/admin/user/{user_id}/details")
-async def get_user_details(user_id: str, user: User = Depends(get_current_user)):
-    user_data = await db.users.find_one({"id": user_id}, {"_id": 0})
-    if not user_data:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    profile = await db.user_profiles.find_one({"user_id": user_id}, {"_id": 0})
-    follow_ups = await db.follow_ups.find({"user_id": user_id}, {"_id": 0}).sort("date", -1).to_list(50)
+@api_router.get("/admin/stats")
+async def get_admin_stats(user: User = Depends(get_current_user)):
+    return await load_admin_stats()
+
+# Live admin stats
+# Each connection reads a snapshot, then forwards event bus traffic: stat
+# deltas coalesced into a single message and new users / prakriti changes
+# batched, at most once per ADMIN_STREAM_INTERVAL. The bus only carries this
+# worker's writes, so the snapshot is re-read every ADMIN_STREAM_SNAPSHOT_INTERVAL
+# to pick up the other workers' (and manage.py's) changes, and immediately when
+# the subscriber's queue overflowed. That is the only DB load a watching admin adds.
+ADMIN_STREAM_INTERVAL = float(os.environ.get('ADMIN_STREAM_INTERVAL', '1.0'))
+ADMIN_STREAM_KEEPALIVE = float(os.environ.get('ADMIN_STREAM_KEEPALIVE', '15'))
+ADMIN_STREAM_SNAPSHOT_INTERVAL = float(os.environ.get('ADMIN_STREAM_SNAPSHOT_INTERVAL', '60'))
+
+def sse_message(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {dump_json(data).decode()}\n\n"
+
+def coalesce_admin_events(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    deltas: Dict[str, Any] = {}
+    new_users, prakriti_changes = [], {}
+    for event in events:
+        if event['type'] == "stats":
+            for key, value in event['increments'].items():
+                # Dotted counter paths become nested deltas matching /admin/stats
+                *parents, leaf = key.split(".")
+                target = deltas
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[leaf] = target.get(leaf, 0) + value
+        elif event['type'] == "new_user":
+            new_users.append(event['user'])
+        elif event['type'] == "prakriti_changed":
+            prakriti_changes[event['user_id']] = event['prakriti_type']
+    return {"deltas": deltas, "new_users": new_users, "prakriti_changes": prakriti_changes}
+
+@api_router.get("/admin/stats/stream")
+async def stream_admin_stats(request: Request, user: User = Depends(get_current_user)):
+    async def event_stream():
+        # Subscribe before reading the snapshot: a write racing the read may be
+        # counted twice until the next snapshot, but none is missed
+        async with event_bus.subscribe("admin") as subscription:
+            yield sse_message("snapshot", await load_admin_stats())
+            dropped = subscription.dropped
+            last_flush = 0.0
+            last_snapshot = time.monotonic()
+            while not await request.is_disconnected():
+                snapshot_due = last_snapshot + ADMIN_STREAM_SNAPSHOT_INTERVAL - time.monotonic()
+                events = []
+                try:
+                    events.append(await asyncio.wait_for(
+                        subscription.queue.get(), timeout=max(0.0, min(ADMIN_STREAM_KEEPALIVE, snapshot_due))
+                    ))
+                except asyncio.TimeoutError:
+                    pass
+                if events:
+                    delay = last_flush + ADMIN_STREAM_INTERVAL - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                while not subscription.queue.empty():
+                    events.append(subscription.queue.get_nowait())
+                last_flush = time.monotonic()
+                
+                batch = coalesce_admin_events(events)
+                if subscription.dropped != dropped or last_flush - last_snapshot >= ADMIN_STREAM_SNAPSHOT_INTERVAL:
+                    # The snapshot supersedes any deltas drained alongside it
+                    dropped = subscription.dropped
+                    last_snapshot = last_flush
+                    yield sse_message("snapshot", await load_admin_stats())
+                elif batch['deltas']:
+                    yield sse_message("stats", batch['deltas'])
+                elif not events:
+                    yield ": keep-alive\n\n"
+                if batch['new_users']:
+                    yield sse_message("new_users", batch['new_users'])
+                if batch['prakriti_changes']:
+                    yield sse_message("prakriti_changes", batch['prakriti_changes'])
     
-    return {
-        "user": user_data,
-        "profile": profile,
-        "follow_ups": follow_ups
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# User details are assembled server-side with one aggregation: users joined to
+# their profile and progress rollup by plain equality $lookups, which use the
+# user_profiles.user_id and rollup _id indexes on every server version.
+# Follow-ups need a per-user sort + limit, which $lookup can only express as a
+# sub-pipeline (an unindexed $expr match before MongoDB 5.0), so they are read
+# concurrently with the aggregation as one indexed query per user. Deployments
+# whose MongoDB rejects the aggregation fall back to concurrent reads.
+ADMIN_DETAIL_SECTIONS = ("user", "profile", "follow_ups", "progress")
+ADMIN_DETAILS_BATCH_MAX = 100
+ADMIN_DETAIL_LOOKUPS = {
+    "profile": ("user_profiles", "user_id"),
+    "progress": ("follow_up_rollups", "_id"),
+}
+
+def _admin_detail_sections(fields: Optional[str]) -> List[str]:
+    requested = [field.strip() for field in fields.split(",") if field.strip()] if fields else list(ADMIN_DETAIL_SECTIONS)
+    unknown = [field for field in requested if field not in ADMIN_DETAIL_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
+
+def _user_details_pipeline(user_ids: List[str], sections: List[str]) -> List[Dict[str, Any]]:
+    user_projection = USER_DOC_PROJECTION if "user" in sections else {"_id": 0, "id": 1}
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": {"id": {"$in": user_ids}}},
+        {"$project": user_projection}
+    ]
+    for section in sections:
+        if section in ADMIN_DETAIL_LOOKUPS:
+            collection, foreign_field = ADMIN_DETAIL_LOOKUPS[section]
+            pipeline.append({"$lookup": {
+                "from": collection,
+                "localField": "id",
+                "foreignField": foreign_field,
+                "as": f"_{section}"
+            }})
+    return pipeline
+
+def _assemble_user_details(doc: Dict[str, Any], sections: List[str], follow_ups_limit: int) -> Dict[str, Any]:
+    details: Dict[str, Any] = {}
+    joined = {section: doc.pop(f"_{section}", []) for section in ("profile", "follow_ups", "progress")}
+    for section in sections:
+        if section == "user":
+            details["user"] = doc
+        elif section == "profile":
+            profile = joined["profile"][0] if joined["profile"] else None
+            details["profile"] = {key: value for key, value in profile.items() if key != "_id"} if profile else None
+        elif section == "follow_ups":
+            page = page_follow_ups(joined["follow_ups"], follow_ups_limit)
+            details["follow_ups"] = page['follow_ups']
+            details["follow_ups_next_cursor"] = page['next_cursor']
+        elif section == "progress":
+            details["progress"] = summarize_progress(joined["progress"][0] if joined["progress"] else None)
+    return details
+
+async def _read_recent_follow_ups(user_id: str, follow_ups_limit: int) -> List[Dict[str, Any]]:
+    # One extra entry so page_follow_ups can tell whether another page exists
+    return await db.follow_ups.find(_follow_ups_query(user_id), {"_id": 0}).sort(
+        FOLLOW_UPS_SORT
+    ).limit(follow_ups_limit + 1).to_list(follow_ups_limit + 1)
+
+async def _read_user_details(user_id: str, sections: List[str], follow_ups_limit: int) -> Optional[Dict[str, Any]]:
+    user_projection = USER_DOC_PROJECTION if "user" in sections else {"_id": 0, "id": 1}
+    reads = {
+        "profile": lambda: db.user_profiles.find({"user_id": user_id}, {"_id": 0}).limit(1).to_list(1),
+        "follow_ups": lambda: _read_recent_follow_ups(user_id, follow_ups_limit),
+        "progress": lambda: db.follow_up_rollups.find({"_id": user_id}).limit(1).to_list(1),
     }
+    joined = [section for section in sections if section in reads]
+    user_data, *results = await asyncio.gather(
+        db.users.find_one({"id": user_id}, user_projection),
+        *(reads[section]() for section in joined)
+    )
+    if not user_data:
+        return None
+    user_data.update({f"_{section}": result for section, result in zip(joined, results)})
+    return _assemble_user_details(user_data, sections, follow_ups_limit)
+
+async def load_user_details(user_ids: List[str], sections: List[str], follow_ups_limit: int) -> Dict[str, Dict[str, Any]]:
+    follow_up_reads = [
+        _read_recent_follow_ups(user_id, follow_ups_limit) for user_id in user_ids
+    ] if "follow_ups" in sections else []
+    try:
+        docs, *follow_ups = await asyncio.gather(
+            db.users.aggregate(_user_details_pipeline(user_ids, sections)).to_list(None),
+            *follow_up_reads
+        )
+    except OperationFailure as e:
+        logger.warning(f"User details aggregation failed, falling back to concurrent reads: {e}")
+        results = await asyncio.gather(*(_read_user_details(user_id, sections, follow_ups_limit) for user_id in user_ids))
+        return {user_id: details for user_id, details in zip(user_ids, results) if details is not None}
+    
+    follow_ups_by_user = dict(zip(user_ids, follow_ups))
+    for doc in docs:
+        if "follow_ups" in sections:
+            doc["_follow_ups"] = follow_ups_by_user.get(doc['id'], [])
+    return {doc['id']: _assemble_user_details(doc, sections, follow_ups_limit) for doc in docs}
+
+@api_router.get("/admin/user/{user_id}/details")
+async def get_user_details(
+    user_id: str,
+    fields: Optional[str] = None,
+    follow_ups_limit: int = Query(50, ge=1, le=FOLLOW_UPS_MAX_PAGE_SIZE),
+    user: User = Depends(get_current_user)
+):
+    details = await load_user_details([user_id], _admin_detail_sections(fields), follow_ups_limit)
+    if user_id not in details:
+        raise HTTPException(status_code=404, detail="User not found")
+    return json_response(details[user_id])
+
+@api_router.post("/admin/users/details")
+async def get_users_details(
+    request_data: UserDetailsRequest,
+    fields: Optional[str] = None,
+    follow_ups_limit: int = Query(10, ge=1, le=FOLLOW_UPS_MAX_PAGE_SIZE),
+    user: User = Depends(get_current_user)
+):
+    user_ids = list(dict.fromkeys(request_data.user_ids))
+    if not user_ids or len(user_ids) > ADMIN_DETAILS_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {ADMIN_DETAILS_BATCH_MAX} user ids")
+    details = await load_user_details(user_ids, _admin_detail_sections(fields), follow_ups_limit)
+    return json_response({
+        "details": details,
+        "missing": [user_id for user_id in user_ids if user_id not in details]
+    })
+
+@api_router.get("/admin/user/{user_id}/progress")
+async def get_user_progress(user_id: str, weeks: int = Query(PROGRESS_WEEKS, ge=0, le=520), user: User = Depends(get_current_user)):
+    return await load_progress(user_id, weeks)
 
 app.include_router(api_router)
 
@@ -463,12 +2096,257 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression
+# Negotiates br (when the brotli module is installed) or gzip from
+# Accept-Encoding for bodies of at least COMPRESSION_MIN_SIZE bytes. Event
+# streams and responses that already carry a Content-Encoding pass through
+# untouched; other streaming responses (exports) are compressed as they stream.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            weights[coding.strip().lower()] = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            weights[coding.strip().lower()] = 0.0
+    
+    def weight(coding: str) -> float:
+        return weights.get(coding, weights.get("*", 0.0))
+    
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    candidates = [coding for coding in available if weight(coding) > 0]
+    # Ties go to the first available coding, so br wins over gzip
+    return max(candidates, key=weight, default=None)
+
+class StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk)
+        return self._compressor.compress(chunk)
+    
+    def finish(self, chunk: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.finish()
+        return self._compressor.compress(chunk) + self._compressor.flush()
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start = None
+        passthrough = False
+        compressor = None
+        
+        async def send_compressed(message):
+            nonlocal start, passthrough, compressor
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = "content-encoding" in headers or headers.get("content-type", "").startswith("text/event-stream")
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The compressed representation is no longer byte-identical
+                    headers["ETag"] = f"W/{etag}"
+                compressor = StreamCompressor(encoding)
+                if not more_body:
+                    body = compressor.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                await send(start)
+            
+            if more_body:
+                chunk = compressor.compress(body)
+                # The compressor buffers small chunks; only send once it emits output
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+        
+        await self.app(scope, receive, send_compressed)
+
+app.add_middleware(CompressionMiddleware)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        queries = []
+        token = _request_queries.set(queries)
+        started = time.perf_counter()
+        status = 500
+        first_byte = None
+        
+        async def send_with_status(message):
+            nonlocal status, first_byte
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                first_byte = time.perf_counter() - started
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Time to the first byte, so long-lived streams don't skew the histogram
+            elapsed = first_byte if first_byte is not None else time.perf_counter() - started
+            _request_queries.reset(token)
+            # The router records the matched route on the shared scope
+            route = scope.get("route")
+            path = route.path if route else "unmatched"
+            method = scope["method"]
+            http_request_duration.observe((method, path), elapsed)
+            http_requests_total.inc((method, path, str(status)))
+            if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+                breakdown = ", ".join(f"{collection}.{command} {ms}ms" for collection, command, ms in queries)
+                logger.warning(f"Slow request {method} {path} {status} took {elapsed * 1000:.1f}ms; queries: [{breakdown}]")
+
+# Outermost, so compressed and streamed responses are measured as sent
+app.add_middleware(RequestMetricsMiddleware)
+
+@app.get("/metrics")
+async def metrics():
+    lines = []
+    for metric in (http_request_duration, http_requests_total, mongo_command_duration, mongo_command_failures, llm_call_duration, llm_tokens_estimated):
+        lines.extend(metric.render())
+    llm = llm_metrics()
+    lines.extend(render_sample("llm_in_flight", "LLM calls in flight", llm['in_flight']))
+    lines.extend(render_sample("llm_queue_depth", "LLM calls waiting for a slot", llm['queue_depth']))
+    lines.extend(render_sample("llm_queue_rejections_total", "LLM calls rejected because the wait queue was full", llm['queue_rejections'], "counter"))
+    lines.extend(render_sample("llm_user_rate_limited_total", "Analyses rejected by the per-user token bucket", llm['user_rate_limited'], "counter"))
+    lines.extend(render_sample("llm_breaker_open", "1 if the LLM circuit breaker is open or half-open", int(llm['breaker_state'] != "closed")))
+    lines.extend(render_sample("llm_breaker_opened_total", "Times the LLM circuit breaker opened", llm['breaker_opened_total'], "counter"))
+    lines.extend(render_sample("llm_fallbacks_total", "Analyses answered with the deterministic summary", llm['fallbacks'], "counter"))
+    cache = session_cache.stats()
+    lines.extend(render_sample("session_cache_size", "Entries in the session cache", cache['size']))
+    lines.extend(render_sample("session_cache_hits_total", "Session cache hits", cache['hits'], "counter"))
+    lines.extend(render_sample("session_cache_misses_total", "Session cache misses", cache['misses'], "counter"))
+    bus = event_bus.stats()
+    lines.extend(render_sample("event_bus_subscribers", "Event bus subscribers in this process", bus['subscribers']))
+    lines.extend(render_sample("event_bus_published_total", "Events published on the event bus", bus['published'], "counter"))
+    lines.extend(render_sample("event_bus_dropped_total", "Events dropped from full subscriber queues", bus['dropped'], "counter"))
+    lines.extend(render_sample("prakriti_job_queue_depth", "Prakriti jobs queued in this process", prakriti_job_queue.qsize() if prakriti_job_queue else 0))
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+# Indexes
+# (collection, keys, options) created idempotently on startup. Every query the
+# routes issue must be covered by one of these; `python manage.py check-indexes`
+# verifies that with explain.
+INDEX_SPECS = [
+    ("user_sessions", [("session_token", ASCENDING)], {"unique": True}),
+    ("user_sessions", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ("users", [("id", ASCENDING)], {"unique": True}),
+    ("users", [("email", ASCENDING)], {"unique": True}),
+    ("users", [("name_lower", ASCENDING)], {}),
+    ("users", [("email_lower", ASCENDING)], {}),
+    ("users", [("created_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("users", [("prakriti_type", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("user_profiles", [("user_id", ASCENDING)], {"unique": True}),
+    ("user_profiles", [("prakriti_type", ASCENDING)], {}),
+    ("diet_plans", [("user_id", ASCENDING)], {"unique": True}),
+    ("daily_schedules", [("user_id", ASCENDING)], {"unique": True}),
+    ("follow_ups", [("user_id", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)], {}),
+    ("follow_ups", [("user_id", ASCENDING), ("id", ASCENDING)], {"unique": True}),
+    ("prakriti_jobs", [("id", ASCENDING)], {"unique": True}),
+    ("prakriti_jobs", [("status", ASCENDING), ("created_at", ASCENDING)], {}),
+]
+
+# Indexes superseded by an entry above, dropped on startup where they still exist
+OBSOLETE_INDEXES = [
+    ("follow_ups", "id_1"),
+    ("users", "name_1"),
+]
+
+async def ensure_indexes():
+    for collection, name in OBSOLETE_INDEXES:
+        try:
+            await db[collection].drop_index(name)
+        except OperationFailure:
+            pass
+    for collection, keys, options in INDEX_SPECS:
+        try:
+            await db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            logger.error(f"Failed to create index {keys} on {collection}: {e}")
+
+@app.on_event("startup")
+async def startup_indexes():
+    await ensure_indexes()
+
+@app.on_event("startup")
+async def startup_insight_cache():
+    await preload_insights()
+
+@app.on_event("startup")
+async def startup_stats_counters():
+    if not await db.stats_counters.find_one({"_id": STATS_COUNTERS_ID}, {"_id": 1}):
+        await reconcile_admin_stats()
+
+@app.on_event("startup")
+async def startup_auth_client():
+    global auth_client
+    auth_client = create_auth_client()
+
+@app.on_event("startup")
+async def startup_prakriti_workers():
+    await start_prakriti_workers()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await stop_prakriti_workers()
+    if auth_client:
+        await auth_client.aclose()
     client.close()
\ No newline at end of file